@@ -2,11 +2,14 @@
 import os
 from flask import Flask
 from config import Config
+from commands import register_commands
 from dotenv import load_dotenv
-from extensions import db, migrate, login_manager
+from extensions import db, migrate, login_manager, page_cache, fragment_cache, cart_store
 from blueprints.public import bp as public_bp
 from blueprints.shop import bp as shop_bp
 from blueprints.admin import bp as admin_bp
+from services import analytics, db_tuning, instrumentation, pricing, revision, snapshot
+from services.http_cache import upload_cache_headers
 
 load_dotenv()
 
@@ -19,13 +22,26 @@ def create_app():
 
     # 3. Ініціалізація розширень
     db.init_app(app)
+    db_tuning.init_app(app)
+    analytics.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
+    page_cache.init_app(app)
+    fragment_cache.init_app(app)
+    cart_store.init_app(app)
+    revision.init_app(app)
+    pricing.init_app(app)
+    snapshot.init_app(app)
+    instrumentation.init_app(app)
 
     # 4. Реєстрація Blueprints (модульна архітектура)
     app.register_blueprint(public_bp)
     app.register_blueprint(shop_bp)
     app.register_blueprint(admin_bp)
+    register_commands(app)
+
+    # Довгий кеш для завантажених фото (імена файлів унікальні)
+    app.after_request(upload_cache_headers)
 
     # 5. Health-check endpoint (перевірка стану сервера)
     @app.route("/health")
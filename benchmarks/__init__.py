@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Скрипти вимірювань запускаються як модулі: python -m benchmarks.<назва>
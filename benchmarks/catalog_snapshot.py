@@ -0,0 +1,134 @@
+# benchmarks/catalog_snapshot.py
+# Публічні сторінки з БД через ORM (CATALOG_SNAPSHOT=0) проти знімка каталогу в пам'яті
+# (services/snapshot.py) і знімка разом із кешем фрагментів шаблонів (services/fragment_cache.py):
+# запитів/с, затримка і кількість SQL-запитів на сторінку.
+# Кеш сторінок вимкнено, щоб міряти саме читання каталогу й рендеринг.
+#
+#   python -m benchmarks.catalog_snapshot --products 2000 --requests 300
+import argparse, json, os, random, statistics, sys, tempfile, time, tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.checkout_lock import percentile
+
+CATEGORIES = ["троянди", "класика", "декор", "весілля"]
+WAX_TYPES = ["соєвий", "кокосовий", "бджолиний"]
+
+
+def seed(db, models, products):
+    rng = random.Random(1)
+    for i in range(products):
+        product = models.Product(sku=f"SNAP-{i}", name=f"Свічка {i}", description="Опис " * 20,
+                                 category=rng.choice(CATEGORIES), wax_type=rng.choice(WAX_TYPES),
+                                 price=rng.randrange(100, 1500, 10), is_active=rng.random() > 0.05)
+        product.colors = [models.Color(color_name=name, color_hex="#ffffff", price_modifier=modifier)
+                          for name, modifier in (("Білий", 0.0), ("Червоний", 0.1), ("Золотий", 0.25))]
+        product.images = [models.ProductImage(filename=f"snap{i}_{n}.jpg", preview_filename=f"snap{i}_{n}_p.jpg",
+                                              sort_order=n, status="ready",
+                                              variants={"jpeg": [[320, f"snap{i}_{n}_320.jpg"]]})
+                          for n in range(2)]
+        db.session.add(product)
+    for i in range(20):
+        db.session.add(models.Composition(title=f"Композиція {i}", is_active=True))
+    db.session.commit()
+
+
+def scenarios(product_ids, rng):
+    return {
+        "/catalog": lambda: "/catalog",
+        "/catalog?category&sort": lambda: f"/catalog?category={rng.choice(CATEGORIES)}&sort=price_asc",
+        "/catalog?wax_type&price": lambda: f"/catalog?wax_type={rng.choice(WAX_TYPES)}&price=200-500",
+        "/product/<id>": lambda: f"/product/{rng.choice(product_ids)}",
+    }
+
+
+def run(args):
+    from sqlalchemy import event
+    from app import create_app
+    from extensions import db
+    import models
+    from services.snapshot import CatalogSnapshot
+
+    app = create_app()
+    app.config.update(PAGE_CACHE_BACKEND="null")
+    app.extensions["page_cache"].init_app(app)
+    fragments = app.extensions["fragment_cache"]
+    with app.app_context():
+        db.create_all()
+        seed(db, models, args.products)
+        product_ids = [pid for (pid,) in db.session.query(models.Product.id)]
+
+        # Вартість перебудови знімка після зміни каталогу
+        builds = []
+        for _ in range(5):
+            started = time.perf_counter()
+            CatalogSnapshot.build()
+            builds.append((time.perf_counter() - started) * 1000)
+        tracemalloc.start()
+        snapshot = CatalogSnapshot.build()
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del snapshot
+        db.session.remove()
+
+        queries = {"count": 0}
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            queries["count"] += 1
+
+    client = app.test_client()
+    results = {"products": args.products,
+               "snapshot_build_ms": round(statistics.median(builds), 1),
+               "snapshot_memory_kb": round(memory / 1024)}
+    modes = (("orm", False, "null"), ("snapshot", True, "null"), ("snapshot_fragments", True, "memory"))
+    for mode, snapshot_enabled, fragment_backend in modes:
+        app.config.update(CATALOG_SNAPSHOT=snapshot_enabled, FRAGMENT_CACHE_BACKEND=fragment_backend)
+        fragments.init_app(app)
+        rng = random.Random(args.seed)
+        results[mode] = {}
+        for name, url in scenarios(product_ids, rng).items():
+            client.get(url())  # прогрів: знімок будується один раз
+            if fragment_backend != "null":
+                for _ in range(args.requests):
+                    client.get(url())  # і фрагменти всіх товарів, що трапляються у сценарії
+            timings, counts = [], []
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                queries["count"] = 0
+                t0 = time.perf_counter()
+                response = client.get(url())
+                timings.append((time.perf_counter() - t0) * 1000)
+                counts.append(queries["count"])
+                assert response.status_code == 200, (url, response.status_code)
+            elapsed = time.perf_counter() - started
+            results[mode][name] = {
+                "req_per_sec": round(args.requests / elapsed, 1),
+                "ms_p50": round(statistics.median(timings), 2),
+                "ms_p95": round(percentile(timings, 95), 2),
+                "queries_per_request": round(statistics.mean(counts), 1),
+            }
+    results["speedup"] = {
+        mode: {name: round(results[mode][name]["req_per_sec"] / results["orm"][name]["req_per_sec"], 2)
+               for name in results["orm"]}
+        for mode, _, _ in modes[1:]
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # Окрема тимчасова БД: конфіг читає DATABASE_URL під час імпорту
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmp, "bench.db")
+        os.environ.setdefault("SECRET_KEY", "bench")
+        print(json.dumps(run(args), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
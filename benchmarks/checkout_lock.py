@@ -0,0 +1,129 @@
+# benchmarks/checkout_lock.py
+# Скільки триває блокування запису SQLite на одне замовлення:
+# старий построковий checkout проти services.orders.place_order.
+#
+#   python -m benchmarks.checkout_lock --orders 200 --lines 20
+import argparse, json, os, random, statistics, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FORM = {"name": "Bench", "phone": "+380000000000", "contact_method": "phone", "address": "", "comment": ""}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def seed(db, models, products):
+    for i in range(products):
+        product = models.Product(sku=f"BENCH-{i}", name=f"Свічка {i}", price=100 + i % 400, is_active=True)
+        db.session.add(product)
+        db.session.flush()
+        db.session.add_all([
+            models.Color(product_id=product.id, color_name="Білий", color_hex="#ffffff", price_modifier=0.0),
+            models.Color(product_id=product.id, color_name="Червоний", color_hex="#cc0000", price_modifier=0.1),
+        ])
+    db.session.commit()
+
+
+def make_cart(db, models, lines):
+    colors = random.sample(db.session.query(models.Color.id, models.Color.product_id).all(), lines)
+    return [{"product_id": product_id, "color_id": color_id, "quantity": random.randint(1, 3), "unit_price": 0}
+            for color_id, product_id in colors]
+
+
+def legacy_place_order(db, models, form, cart):
+    # Відтворення checkout до переходу на place_order: flush, два SELECT і INSERT на рядок, UPDATE суми
+    order = models.Order(customer_name=form.get("name"), phone=form.get("phone"),
+                         contact_method=form.get("contact_method"), address=form.get("address"),
+                         comment=form.get("comment"), status="new")
+    db.session.add(order)
+    db.session.flush()
+    total = 0.0
+    for it in cart:
+        product = models.Product.query.get(it["product_id"])
+        color = models.Color.query.get(it["color_id"]) if it.get("color_id") else None
+        if not product:
+            continue
+        price = round(product.price * (1 + (color.price_modifier if color else 0.0)), 2)
+        db.session.add(models.OrderItem(order_id=order.id, product_id=product.id,
+                                        color_id=color.id if color else None,
+                                        quantity=it["quantity"], unit_price=price))
+        total += price * it["quantity"]
+    order.total_amount = total
+    db.session.commit()
+    return order
+
+
+def run(args):
+    from sqlalchemy import event
+    from app import create_app
+    from extensions import db
+    import models
+    from services.orders import place_order
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seed(db, models, args.products)
+        random.seed(args.seed)
+        carts = [make_cart(db, models, args.lines) for _ in range(args.orders)]
+
+        state = {"write_started": None, "statements": 0, "in_lock": 0}
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            state["statements"] += 1
+            if state["write_started"] is None and statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+                state["write_started"] = time.perf_counter()
+            if state["write_started"] is not None:
+                state["in_lock"] += 1
+
+        results = {}
+        strategies = {
+            "legacy": lambda cart: legacy_place_order(db, models, FORM, cart),
+            "bulk": lambda cart: place_order(FORM, cart),
+        }
+        for name, strategy in strategies.items():
+            lock_ms, statements, in_lock = [], [], []
+            started = time.perf_counter()
+            for cart in carts:
+                state.update(write_started=None, statements=0, in_lock=0)
+                strategy(cart)
+                # COMMIT завершився — блокування запису знято
+                lock_ms.append((time.perf_counter() - state["write_started"]) * 1000)
+                statements.append(state["statements"])
+                in_lock.append(state["in_lock"])
+                db.session.remove()
+            elapsed = time.perf_counter() - started
+            results[name] = {
+                "orders": len(carts),
+                "lines_per_order": args.lines,
+                "lock_ms_p50": round(statistics.median(lock_ms), 3),
+                "lock_ms_p95": round(percentile(lock_ms, 95), 3),
+                "lock_ms_max": round(max(lock_ms), 3),
+                "statements_per_order": round(statistics.mean(statements), 1),
+                "statements_while_locked": round(statistics.mean(in_lock), 1),
+                "orders_per_sec": round(len(carts) / elapsed, 1),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # Окрема тимчасова БД: конфіг читає DATABASE_URL під час імпорту
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmp, "bench.db")
+        os.environ.setdefault("SECRET_KEY", "bench")
+        print(json.dumps(run(args), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# benchmarks/concurrent_writes.py
+# Пропускна здатність checkout при кількох процесах (як воркери gunicorn) на одній SQLite:
+# стандартні налаштування SQLite (SQLITE_TUNING=0) проти WAL + PRAGMA з config.SQLITE_PRAGMAS.
+# Паралельно з писачами працюють читачі каталогу — саме вони блокують запис у rollback-журналі.
+#
+#   python -m benchmarks.concurrent_writes --writers 4 --readers 4 --duration 10
+import argparse, json, multiprocessing, os, random, statistics, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.checkout_lock import FORM, percentile, seed
+
+MODES = {"default": "0", "tuned": "1"}
+
+
+def _app():
+    # Імпорт після того, як батьківський процес виставив DATABASE_URL і SQLITE_TUNING
+    from app import create_app
+    return create_app()
+
+
+def prepare(products):
+    from extensions import db
+    import models
+    from services.db_tuning import sqlite_pragmas
+
+    app = _app()
+    with app.app_context():
+        db.create_all()
+        seed(db, models, products)
+        return sqlite_pragmas()
+
+
+def writer(worker_id, lines, start, deadline, results):
+    from sqlalchemy.exc import OperationalError
+    from extensions import db
+    import models
+    from services.orders import place_order
+
+    app = _app()
+    rng = random.Random(worker_id)
+    latencies, errors = [], 0
+    with app.app_context():
+        colors = db.session.query(models.Color.id, models.Color.product_id).all()
+        db.session.remove()
+        start.wait()
+        while time.time() < deadline.value:
+            cart = [{"product_id": product_id, "color_id": color_id, "quantity": rng.randint(1, 3), "unit_price": 0}
+                    for color_id, product_id in rng.sample(colors, lines)]
+            started = time.perf_counter()
+            try:
+                place_order(FORM, cart)
+                latencies.append((time.perf_counter() - started) * 1000)
+            except OperationalError:
+                # database is locked після busy_timeout
+                errors += 1
+            db.session.remove()
+    results.put(("writer", latencies, errors))
+
+
+def reader(worker_id, start, deadline, results):
+    from sqlalchemy.exc import OperationalError
+    from extensions import db
+    from services.catalog import load_catalog_page
+
+    app = _app()
+    pages, errors = 0, 0
+    with app.app_context():
+        start.wait()
+        while time.time() < deadline.value:
+            try:
+                load_catalog_page({}, "new", None, 24)
+                pages += 1
+            except OperationalError:
+                errors += 1
+            db.session.remove()
+    results.put(("reader", pages, errors))
+
+
+def run_mode(ctx, mode, args, tmp):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmp, f"{mode}.db")
+    os.environ["SQLITE_TUNING"] = MODES[mode]
+
+    # Схема і дані — в окремому процесі, щоб батьківський не тримав з'єднань
+    with ctx.Pool(1) as pool:
+        pragmas = pool.apply(prepare, (args.products,))
+
+    # Бар'єр: відлік починається, коли всі процеси імпортували застосунок
+    start = ctx.Barrier(args.writers + args.readers + 1)
+    deadline, results = ctx.Value("d", 0.0), ctx.Queue()
+    procs = [ctx.Process(target=writer, args=(i, args.lines, start, deadline, results)) for i in range(args.writers)]
+    procs += [ctx.Process(target=reader, args=(i, start, deadline, results)) for i in range(args.readers)]
+    for p in procs:
+        p.start()
+    deadline.value = time.time() + 3600
+    start.wait()
+    deadline.value = time.time() + args.duration
+
+    latencies, write_errors, pages, read_errors = [], 0, 0, 0
+    for _ in procs:
+        kind, value, errors = results.get()
+        if kind == "writer":
+            latencies += value
+            write_errors += errors
+        else:
+            pages += value
+            read_errors += errors
+    for p in procs:
+        p.join()
+
+    return {
+        "pragmas": pragmas,
+        "writers": args.writers,
+        "readers": args.readers,
+        "orders": len(latencies),
+        "orders_per_sec": round(len(latencies) / args.duration, 1),
+        "order_ms_p50": round(statistics.median(latencies), 2) if latencies else None,
+        "order_ms_p95": round(percentile(latencies, 95), 2) if latencies else None,
+        "order_ms_max": round(max(latencies), 2) if latencies else None,
+        "write_errors": write_errors,
+        "catalog_pages_per_sec": round(pages / args.duration, 1),
+        "read_errors": read_errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=5)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ["PAGE_CACHE_BACKEND"] = "null"
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {mode: run_mode(ctx, mode, args, tmp) for mode in MODES}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
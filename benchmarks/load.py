@@ -0,0 +1,215 @@
+# benchmarks/load.py
+# Навантаження по HTTP на create_app() під gunicorn: віртуальні покупці гортають каталог
+# і сторінки товарів, частина кладе товари в кошик і оформлює замовлення.
+# Драйвер — лише стандартна бібліотека (urllib, threading); БД засіває benchmarks.seed.
+# Результат — JSON з p50/p95/p99 і пропускною здатністю для порівняння запусків.
+#
+#   python -m benchmarks.load --products 2000 --orders 20000 --workers 4 --concurrency 16 --duration 30
+#   python -m benchmarks.load --db /tmp/bench.db --env CATALOG_SNAPSHOT=0 --output before.json
+#   python -m benchmarks.load --url http://127.0.0.1:8000 --db /tmp/bench.db   # уже запущений сервер
+import argparse, json, os, random, socket, sqlite3, subprocess, sys, tempfile, threading, time
+import urllib.error, urllib.parse, urllib.request
+from http.cookiejar import CookieJar
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.checkout_lock import FORM, percentile
+from benchmarks.seed import CATEGORIES, WAX_TYPES
+
+CATALOG_QUERIES = [""] + [f"?category={urllib.parse.quote(c)}" for c in CATEGORIES] \
+    + [f"?wax_type={urllib.parse.quote(w)}" for w in WAX_TYPES] + ["?sort=price_asc", "?sort=price_desc"]
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # 302 після оформлення міряємо окремо від сторінки успіху
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Shopper:
+    def __init__(self, base_url, catalog, rng, timeout):
+        self.base_url = base_url
+        self.catalog = catalog
+        self.rng = rng
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect)
+        self.samples = []  # (крок, мс, статус)
+
+    def request(self, step, path, data=None, json_body=None):
+        headers = {}
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        elif data is not None:
+            data = urllib.parse.urlencode(data).encode()
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers)
+        started = time.perf_counter()
+        location = None
+        try:
+            with self.opener.open(req, timeout=self.timeout) as resp:
+                resp.read()
+                status = resp.status
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            status, location = exc.code, exc.headers.get("Location")
+        except (urllib.error.URLError, OSError):
+            status = 0
+        self.samples.append((step, (time.perf_counter() - started) * 1000, status))
+        return status, location
+
+    def browse(self):
+        self.request("catalog", "/catalog" + self.rng.choice(CATALOG_QUERIES))
+        product_id, _ = self.rng.choice(self.catalog)
+        self.request("product", f"/product/{product_id}")
+
+    def buy(self):
+        for product_id, color_id in self.rng.sample(self.catalog, self.rng.randint(1, 3)):
+            self.request("cart_add", "/cart/add",
+                         json_body={"product_id": product_id, "color_id": color_id, "quantity": self.rng.randint(1, 2)})
+        self.request("cart", "/cart")
+        self.request("checkout_form", "/checkout")
+        status, location = self.request("checkout", "/checkout", data=FORM)
+        if status == 302 and location and "/order/success/" in location:
+            self.request("order_success", urllib.parse.urlsplit(location).path)
+
+
+def load_catalog(db_path):
+    # Активні товари з кольорами — напряму з SQLite, без імпорту застосунку
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT p.id, c.id FROM product p JOIN color c ON c.product_id = p.id "
+                            "WHERE p.is_active").fetchall()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(args, db_path, log_path):
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL="sqlite:///" + db_path, SECRET_KEY=os.environ.get("SECRET_KEY", "bench"))
+    env.update(item.split("=", 1) for item in args.env)
+    command = [sys.executable, "-m", "gunicorn", "app:create_app()", "-b", f"127.0.0.1:{port}",
+               "-w", str(args.workers), "--threads", str(args.threads), "--log-level", "warning"]
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            with urllib.request.urlopen(base_url + "/health", timeout=1):
+                return process, base_url
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    process.kill()
+    with open(log_path) as fh:
+        sys.exit("gunicorn не запустився:\n" + fh.read())
+
+
+def run_shoppers(args, base_url, catalog, duration, seed_offset=0):
+    shoppers = [Shopper(base_url, catalog, random.Random(args.seed + seed_offset + i), args.timeout)
+                for i in range(args.concurrency)]
+    flows = [0] * len(shoppers)
+    deadline = time.perf_counter() + duration
+
+    def loop(i, shopper):
+        while time.perf_counter() < deadline:
+            if shopper.rng.random() < args.buy_ratio:
+                shopper.buy()
+            else:
+                shopper.browse()
+            flows[i] += 1
+
+    threads = [threading.Thread(target=loop, args=(i, s)) for i, s in enumerate(shoppers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [sample for s in shoppers for sample in s.samples], sum(flows), time.perf_counter() - started
+
+
+def summarize(latencies):
+    return {"p50": round(percentile(latencies, 50), 2), "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2), "mean": round(sum(latencies) / len(latencies), 2),
+            "max": round(max(latencies), 2)}
+
+
+def report(samples, flows, elapsed):
+    steps = {}
+    for step, ms, status in samples:
+        entry = steps.setdefault(step, {"latencies": [], "errors": 0})
+        entry["latencies"].append(ms)
+        entry["errors"] += status == 0 or status >= 400
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "requests": len(samples),
+        "errors": sum(entry["errors"] for entry in steps.values()),
+        "requests_per_s": round(len(samples) / elapsed, 1),
+        "flows_per_s": round(flows / elapsed, 1),
+        "orders_per_s": round(len(steps.get("order_success", {"latencies": []})["latencies"]) / elapsed, 1),
+        "latency_ms": summarize([ms for _, ms, _ in samples]) if samples else None,
+        "steps": {step: {"count": len(entry["latencies"]), "errors": entry["errors"], **summarize(entry["latencies"])}
+                  for step, entry in sorted(steps.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="Уже запущений сервер; без нього gunicorn стартує сам")
+    parser.add_argument("--db", help="Засіяна БД (python -m benchmarks.seed); без неї — тимчасова")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=2, help="Воркери gunicorn")
+    parser.add_argument("--threads", type=int, default=1, help="Потоки на воркер gunicorn (gthread, якщо > 1)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Змінна середовища для сервера, напр. CATALOG_SNAPSHOT=0 (можна кілька)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Одночасних покупців")
+    parser.add_argument("--duration", type=float, default=20, help="Секунд вимірювання")
+    parser.add_argument("--warmup", type=float, default=3, help="Секунд прогріву, не входять у результат")
+    parser.add_argument("--buy-ratio", type=float, default=0.2, help="Частка сценаріїв з оформленням замовлення")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Записати JSON у файл (також друкується)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.abspath(args.db) if args.db else os.path.join(tmp, "bench.db")
+        if not args.db:
+            subprocess.run([sys.executable, "-m", "benchmarks.seed", db_path, "--products", str(args.products),
+                            "--orders", str(args.orders), "--seed", str(args.seed)],
+                           cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        catalog = load_catalog(db_path)
+        process = None
+        base_url = args.url.rstrip("/") if args.url else None
+        if base_url is None:
+            process, base_url = start_gunicorn(args, db_path, os.path.join(tmp, "gunicorn.log"))
+        try:
+            if args.warmup:
+                run_shoppers(args, base_url, catalog, args.warmup, seed_offset=10_000)
+            samples, flows, elapsed = run_shoppers(args, base_url, catalog, args.duration)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    result = {
+        "config": {"url": args.url, "db": args.db, "products": args.products if not args.db else None,
+                   "orders": args.orders if not args.db else None, "workers": None if args.url else args.workers,
+                   "threads": None if args.url else args.threads, "env": args.env, "concurrency": args.concurrency,
+                   "duration_s": args.duration, "buy_ratio": args.buy_ratio, "seed": args.seed},
+        **report(samples, flows, elapsed),
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/query_budget.py
+# Бюджет SQL-запитів для в'юх з @query_budget (services/query_budget.py) на БД реалістичного
+# розміру, створеній міграціями. Кожен сценарій виконується через справжні маршрути
+# з увімкненою перевіркою; кеш сторінок вимкнено, щоб в'юхи справді відпрацьовували.
+# Знімок каталогу перевіряється в обох режимах (CATALOG_SNAPSHOT=1 і 0).
+# Код виходу 1, якщо бюджет перевищено або в'юха з бюджетом не має сценарію.
+#
+#   python -m benchmarks.query_budget --products 500 --orders 300 [-v]
+import argparse, json, os, random, sys, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.seed import ADMIN, seed
+
+FORM = {"name": "Бюджет", "phone": "+380000000000", "contact_method": "phone", "address": "", "comment": ""}
+
+
+def fill_cart(client, colors):
+    for color_id, product_id in colors:
+        client.post("/cart/add", json={"product_id": product_id, "color_id": color_id, "quantity": 2})
+
+
+def scenarios(client, colors):
+    # Ендпойнт -> [(назва, дія)]; у кошику 10 різних товарів — запитів не має ставати більше
+    from services.catalog import encode_cursor
+
+    return {
+        "public.catalog": [
+            ("catalog", lambda: client.get("/catalog")),
+            ("catalog?category", lambda: client.get("/catalog?category=троянди")),
+            ("catalog?wax_type&price", lambda: client.get("/catalog?wax_type=соєвий&price=200-500")),
+            ("catalog?sort&cursor", lambda: client.get(f"/catalog?sort=price_desc&cursor={encode_cursor([600, 50])}")),
+        ],
+        "public.product_detail": [
+            ("product", lambda: client.get("/product/2")),
+            ("product 404", lambda: client.get("/product/999999")),
+        ],
+        "shop.cart": [
+            ("cart", lambda: client.get("/cart")),
+        ],
+        "shop.checkout": [
+            ("checkout GET", lambda: client.get("/checkout")),
+            ("checkout POST", lambda: client.post("/checkout", data=FORM)),
+        ],
+        "admin.admin_index": [
+            ("dashboard", lambda: client.get("/admin/")),
+            ("dashboard?days", lambda: client.get("/admin/?days=90")),
+        ],
+        "admin.order_list": [
+            ("orders", lambda: client.get("/admin/orders")),
+            ("orders?status", lambda: client.get("/admin/orders?status=new")),
+            ("orders?dates", lambda: client.get("/admin/orders?date_from=2026-01-01&date_to=2026-12-31")),
+            ("orders?cursor", lambda: client.get(f"/admin/orders?cursor={encode_cursor([1790000000000000, 50])}")),
+        ],
+    }
+
+
+def run(args):
+    from flask_migrate import upgrade
+    from app import create_app
+    from extensions import db
+    import models
+    from services.query_budget import QueryBudgetExceeded, count_queries
+
+    app = create_app()
+    app.config.update(TESTING=True, QUERY_BUDGET=True, PAGE_CACHE_BACKEND="null")
+    app.extensions["page_cache"].init_app(app)
+    budgets = {endpoint: view.query_budget for endpoint, view in app.view_functions.items()
+               if hasattr(view, "query_budget")}
+    results = []
+    with app.app_context():
+        upgrade(directory=os.path.join(app.root_path, "migrations"))
+        random.seed(args.seed)
+        seed(db, models, args.products, args.orders, rng=random.Random(args.seed))
+        colors = random.sample(db.session.query(models.Color.id, models.Color.product_id).all(), 10)
+
+    # Запити — поза app_context: інакше всі вони ділять один g і кошик не читався б заново
+    for snapshot in (True, False):
+        app.config["CATALOG_SNAPSHOT"] = snapshot
+        client = app.test_client()
+        client.post("/admin/login", data={"email": ADMIN[0], "password": ADMIN[1]})
+        plan = scenarios(client, colors)
+        for endpoint in sorted(set(budgets) - set(plan)):
+            results.append({"endpoint": endpoint, "scenario": None, "snapshot": snapshot,
+                            "budget": budgets[endpoint], "queries": None, "ok": False})
+        for endpoint, cases in plan.items():
+            for name, action in cases:
+                fill_cart(client, colors)
+                app.config["QUERY_BUDGET"] = False
+                action()  # прогрів без перевірки: знімок каталогу, кеш фрагментів
+                app.config["QUERY_BUDGET"] = True
+                fill_cart(client, colors)
+                error = None
+                with count_queries() as counter:
+                    try:
+                        action()
+                    except QueryBudgetExceeded as exc:
+                        error = str(exc)
+                budget = budgets.get(endpoint)
+                results.append({"endpoint": endpoint, "scenario": name, "snapshot": snapshot, "budget": budget,
+                                "queries": counter.count, "ok": budget is not None and error is None})
+                if args.verbose or error:
+                    print(error or f"{endpoint} [{name}]: {counter.report(budget)}", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Показати запити кожного сценарію")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmp, "budget.db")
+        os.environ.setdefault("SECRET_KEY", "budget")
+        results = run(args)
+    failed = [r for r in results if not r["ok"]]
+    print(json.dumps({"products": args.products, "orders": args.orders, "results": results,
+                      "failed": len(failed)}, ensure_ascii=False, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# benchmarks/query_plans.py
+# Перевірка планів запитів гарячих шляхів на SQLite: БД створюється міграціями,
+# кожен сценарій виконується через справжні маршрути/сервіси, а кожен його
+# SELECT/UPDATE/DELETE проганяється через EXPLAIN QUERY PLAN.
+# Код виходу 1, якщо хоч один запит читає таблицю повним скануванням.
+#
+#   python -m benchmarks.query_plans [-v]
+import argparse, os, re, sys, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# SCAN таблиці — завжди повне читання; SCAN за індексом — лише без LIMIT (з LIMIT це keyset-сторінка)
+FULL_SCAN_RE = re.compile(r"^SCAN (?P<table>[\w\"]+)(?: AS \w+)?(?P<index> USING (?:COVERING )?INDEX \w+)?$")
+LIMIT_RE = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+
+def seed(db, models):
+    from werkzeug.security import generate_password_hash
+    from services.orders import place_order
+
+    for i in range(2):
+        product = models.Product(sku=f"PLAN-{i}", name=f"Свічка {i}", description="опис",
+                                 category="троянди", wax_type="соєвий", price=150, is_active=True)
+        db.session.add(product)
+        db.session.flush()
+        db.session.add_all([
+            models.Color(product_id=product.id, color_name="Білий", color_hex="#ffffff", price_modifier=0.0),
+            models.ProductImage(product_id=product.id, filename=f"plan{i}.jpg", sort_order=0),
+        ])
+    db.session.add(models.Composition(title="Композиція", image="plan0.jpg", is_active=True))
+    db.session.add(models.User(email="plans@example.com", password_hash=generate_password_hash("plans")))
+    db.session.commit()
+    place_order({"name": "План", "phone": "0", "contact_method": "phone"},
+                [{"product_id": 1, "color_id": 1, "quantity": 1, "unit_price": 0}])
+
+
+def scenarios(client, models):
+    # Назва -> дія; усі запити, виконані дією, перевіряються
+    from services.catalog import load_covers, encode_cursor
+    from services.cart import hydrate_cart
+    from services.image_jobs import claim_jobs
+    from services.images import reference_count
+
+    cart = {"1-1": {"product_id": 1, "color_id": 1, "quantity": 2, "unit_price": 0, "seq": 0}}
+    return {
+        "public.index": lambda: client.get("/"),
+        "public.compositions": lambda: client.get("/compositions"),
+        "public.catalog": lambda: client.get("/catalog"),
+        "public.catalog?category": lambda: client.get("/catalog?category=троянди"),
+        "public.catalog?wax_type": lambda: client.get("/catalog?wax_type=соєвий"),
+        "public.catalog?price": lambda: client.get("/catalog?price=0-200&sort=price_asc"),
+        "public.catalog?cursor": lambda: client.get(f"/catalog?sort=price_desc&cursor={encode_cursor([150, 2])}"),
+        "public.product_detail": lambda: client.get("/product/1"),
+        "catalog.covers": lambda: load_covers([1, 2]),
+        "shop.cart": lambda: hydrate_cart(cart),
+        "shop.cart_update": lambda: client.post("/cart/update", json={"lines": {"1-1": 3}}),
+        "shop.checkout": lambda: client.post("/checkout", data={"name": "x", "phone": "0"}),
+        "admin.index": lambda: client.get("/admin/?days=90"),
+        "admin.order_list": lambda: client.get("/admin/orders"),
+        "admin.order_list?status": lambda: client.get("/admin/orders?status=new"),
+        "admin.order_list?contact_method": lambda: client.get("/admin/orders?contact_method=viber"),
+        "admin.order_list?dates": lambda: client.get("/admin/orders?date_from=2026-01-01&date_to=2026-12-31"),
+        "admin.order_list?cursor": lambda: client.get(f"/admin/orders?cursor={encode_cursor([1790000000000000, 5])}"),
+        "images.refcount": lambda: reference_count("plan0.jpg"),
+        "images.claim_jobs": lambda: claim_jobs(limit=4),
+    }
+
+
+def full_scans(plan, tables, statement):
+    limited = bool(LIMIT_RE.search(statement))
+    for row in plan:
+        match = FULL_SCAN_RE.match(row[3])
+        if match and match.group("table").strip('"') in tables and not (match.group("index") and limited):
+            yield row[3]
+
+
+def run(verbose):
+    from sqlalchemy import event
+    from flask_migrate import upgrade
+    from app import create_app
+    from extensions import db
+    import models
+
+    app = create_app()
+    # Перевіряються запити до БД: знімок каталогу (services/snapshot.py) читає таблиці цілком навмисно
+    app.config.update(PAGE_CACHE_BACKEND="null", CATALOG_SNAPSHOT=False)
+    app.extensions["page_cache"].init_app(app)
+    failures = 0
+    with app.app_context():
+        upgrade(directory=os.path.join(app.root_path, "migrations"))
+        seed(db, models)
+        tables = set(db.metadata.tables)
+
+        client = app.test_client()
+        client.post("/admin/login", data={"email": "plans@example.com", "password": "plans"})
+        with client.session_transaction() as session:
+            session["cart"] = {"1-1": {"product_id": 1, "color_id": 1, "quantity": 1, "unit_price": 0, "seq": 0}}
+
+        captured = []
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+                captured.append((statement, parameters))
+
+        for name, action in scenarios(client, models).items():
+            captured.clear()
+            action()
+            db.session.rollback()
+            statements = list(dict.fromkeys((s, tuple(p) if p else ()) for s, p in captured))
+            raw = db.engine.raw_connection()
+            try:
+                for statement, parameters in statements:
+                    plan = raw.cursor().execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+                    scans = list(full_scans(plan, tables, statement))
+                    if scans:
+                        failures += 1
+                        print(f"FAIL {name}: {', '.join(scans)}\n  {' '.join(statement.split())}")
+                    elif verbose:
+                        print(f"ok   {name}: {' | '.join(row[3] for row in plan)}")
+            finally:
+                raw.close()
+            if not verbose and statements:
+                print(f"{name}: {len(statements)} запит(ів) перевірено")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-v", "--verbose", action="store_true", help="Показати план кожного запиту")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmp, "plans.db")
+        os.environ.setdefault("SECRET_KEY", "plans")
+        failures = run(args.verbose)
+    print("Повних сканувань таблиць:", failures)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# benchmarks/seed.py
+# Синтетичний каталог і історія замовлень для бенчмарків: товари з кольорами й фото,
+# композиції, адмін і замовлення за останній рік. БД створюється міграціями (з FTS5),
+# файл — одноразовий; фото є лише рядками в БД, самих файлів немає.
+#
+#   python -m benchmarks.seed /tmp/bench.db --products 2000 --orders 20000
+import argparse, json, os, random, sys, time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CATEGORIES = ("троянди", "півонії", "тюльпани", "букети", "фігурні")
+WAX_TYPES = ("соєвий", "кокосовий", "бджолиний")
+COLORS = (("Білий", "#ffffff", 0.0), ("Червоний", "#cc0000", 0.1), ("Золотий", "#d4af37", 0.25),
+          ("Рожевий", "#f4a6c0", 0.05))
+STATUSES = ("new", "new", "confirmed", "shipped", "done", "done", "done", "cancelled")
+ADMIN = ("bench@example.com", "bench")
+BATCH = 1000
+
+
+def seed(db, models, products, orders, compositions=20, colors=3, images=3, rng=None):
+    # Через ORM — товари (спрацьовують хуки цін і ревізії), замовлення — пакетами через Core
+    from sqlalchemy import insert, select
+    from werkzeug.security import generate_password_hash
+    from services.analytics import rebuild
+    from services.orders import CONTACT_METHODS
+
+    rng = rng or random.Random(1)
+    for i in range(products):
+        product = models.Product(sku=f"BENCH-{i}", name=f"Свічка {i}", description=f"Опис свічки {i}",
+                                 category=CATEGORIES[i % len(CATEGORIES)], wax_type=WAX_TYPES[i % len(WAX_TYPES)],
+                                 price=80 + (i * 37) % 1200, is_active=i % 10 != 0)
+        db.session.add(product)
+        db.session.flush()
+        db.session.add_all(
+            [models.Color(product_id=product.id, color_name=name, color_hex=hex_, price_modifier=modifier,
+                          is_default=n == 0)
+             for n, (name, hex_, modifier) in enumerate(COLORS[:colors])]
+            + [models.ProductImage(product_id=product.id, filename=f"bench{i}-{n}.jpg", sort_order=n)
+               for n in range(images)]
+        )
+        if i % BATCH == BATCH - 1:
+            db.session.commit()
+    db.session.add_all([models.Composition(title=f"Композиція {i}", image=f"bench{i}-0.jpg", is_active=True)
+                        for i in range(compositions)])
+    if not db.session.query(models.User).filter_by(email=ADMIN[0]).first():
+        db.session.add(models.User(email=ADMIN[0], password_hash=generate_password_hash(ADMIN[1])))
+    db.session.commit()
+
+    prices = {(row.product_id, row.color_id): row.price_cents
+              for row in db.session.execute(select(models.ProductPrice.__table__))}
+    lines = [(product_id, color_id) for product_id, color_id in prices if color_id]
+    next_id = (db.session.query(db.func.max(models.Order.id)).scalar() or 0) + 1
+    now = datetime.utcnow()
+    methods = tuple(CONTACT_METHODS)
+    for start in range(0, orders, BATCH):
+        order_rows, item_rows = [], []
+        for order_id in range(next_id + start, next_id + min(start + BATCH, orders)):
+            total = 0
+            for product_id, color_id in rng.sample(lines, min(len(lines), rng.randint(1, 5))):
+                quantity = rng.randint(1, 3)
+                cents = prices[(product_id, color_id)]
+                total += cents * quantity
+                item_rows.append({"order_id": order_id, "product_id": product_id, "color_id": color_id,
+                                  "quantity": quantity, "unit_price": cents / 100})
+            order_rows.append({"id": order_id, "customer_name": f"Клієнт {order_id}",
+                               "phone": f"+380{rng.randint(500000000, 999999999)}",
+                               "contact_method": rng.choice(methods), "address": "", "comment": "",
+                               "total_amount": total / 100, "status": rng.choice(STATUSES),
+                               "created_at": now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))})
+        db.session.execute(insert(models.Order), order_rows)
+        if item_rows:
+            db.session.execute(insert(models.OrderItem), item_rows)
+        db.session.commit()
+    # Замовлення вставлено в обхід place_order — зведення для дашборду рахуємо так само, як після міграції
+    rebuild()
+
+
+def create_database(path, products, orders, compositions=20, seed_value=1):
+    # DATABASE_URL має бути виставлений до імпорту app/config
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.abspath(path)
+    os.environ.setdefault("SECRET_KEY", "bench")
+    from flask_migrate import upgrade
+    from app import create_app
+    from extensions import db
+    import models
+
+    app = create_app()
+    with app.app_context():
+        upgrade(directory=os.path.join(app.root_path, "migrations"))
+        seed(db, models, products, orders, compositions, rng=random.Random(seed_value))
+        db.session.remove()
+        db.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="Файл SQLite (буде створено заново)")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--compositions", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.path + suffix):
+            os.remove(args.path + suffix)
+    started = time.perf_counter()
+    create_database(args.path, args.products, args.orders, args.compositions, args.seed)
+    print(json.dumps({"path": os.path.abspath(args.path), "products": args.products, "orders": args.orders,
+                      "compositions": args.compositions, "admin": ADMIN[0],
+                      "seconds": round(time.perf_counter() - started, 2)}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,44 @@
 # blueprints/admin/routes.py
-import os
-from flask import render_template, request, redirect, url_for, flash, current_app
-from flask_login import login_required, login_user, logout_user
+import hmac, io, json
+from datetime import datetime
+from flask import (render_template, request, redirect, url_for, flash, current_app, stream_template, stream_with_context,
+                   abort, Response)
+from flask_login import current_user, login_required, login_user, logout_user
 from werkzeug.security import check_password_hash
-from extensions import db, login_manager
-from models import Product, Color, ProductImage, Order, User, Composition
-from services.images import save_image
+from extensions import db, login_manager, page_cache, fragment_cache
+from models import Product, Color, ProductImage, User, Composition
+from services.analytics import PERIODS, dashboard
+from services.images import save_image, release_images
+from services.catalog import load_covers
+from services.catalog_import import detect_format, import_catalog
+from services.instrumentation import metrics_text
+from services.order_export import FORMATS, export_orders
+from services.query_budget import query_budget
+from services.orders import (CONTACT_METHODS, ORDER_STATUSES, parse_order_filters, load_orders_page,
+                             iter_orders, order_to_dict)
 from . import bp
 
-# Головна сторінка адмінки
+# Головна сторінка адмінки: продажі за період з rollup-таблиць (services/analytics.py)
 @bp.route("/")
+@query_budget(5)
 @login_required
 def admin_index():
-  return render_template("admin/index.html")
+    days = request.args.get("days", 30, type=int)
+    days = days if days in PERIODS else 30
+    return render_template("admin/index.html", stats=dashboard(days), periods=PERIODS)
+
+# Метрики Prometheus (INSTRUMENTATION=1): для адміна або скрейпера з Bearer METRICS_TOKEN
+@bp.route("/metrics")
+def metrics():
+    text = metrics_text(current_app)
+    if text is None:
+        abort(404)
+    token = current_app.config.get("METRICS_TOKEN")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not current_user.is_authenticated and not (token and hmac.compare_digest(supplied, token)):
+        return current_app.login_manager.unauthorized()
+    return Response(text, content_type="text/plain; version=0.0.4; charset=utf-8",
+                    headers={"Cache-Control": "no-store"})
 
 # Завантаження користувача для Flask-Login
 @login_manager.user_loader
@@ -44,7 +70,27 @@ def logout():
 @login_required
 def product_list():
     products = Product.query.order_by(Product.name).all()
-    return render_template("admin/product_list.html", products=products)
+    covers = load_covers(p.id for p in products)
+    return render_template("admin/product_list.html", products=products, covers=covers)
+
+# Масовий імпорт товарів (CSV / JSONL / JSON); фото — з IMPORT_IMAGES_DIR на сервері
+@bp.route("/products/import", methods=["GET", "POST"])
+@login_required
+def product_import():
+    report = None
+    if request.method == "POST":
+        file = request.files.get("file")
+        fmt = detect_format(file.filename if file else None)
+        if not fmt:
+            flash("Завантажте файл .csv, .jsonl або .json")
+            return redirect(url_for("admin.product_import"))
+        # Файл читається потоком, а не цілком у пам’ять
+        stream = io.TextIOWrapper(file.stream, encoding="utf-8-sig", newline="")
+        report = import_catalog(stream, fmt, images_dir=current_app.config.get("IMPORT_IMAGES_DIR"),
+                                dry_run="dry_run" in request.form)
+        if report.queued and current_app.config.get("IMAGE_PROCESSING") != "queue":
+            flash(f"Фото в черзі: {report.queued}. Запустіть `flask images worker --once`, щоб створити прев’ю.")
+    return render_template("admin/product_import.html", report=report)
 
 @bp.route("/products/edit", methods=["GET", "POST"])
 @bp.route("/products/edit/<int:product_id>", methods=["GET", "POST"])
@@ -97,13 +143,21 @@ def product_edit(product_id=None):
         for file in files:
             if file and file.filename:
                 try:
-                    filename, preview = save_image(file)
-                    img = ProductImage(product_id=product.id, filename=filename, preview_filename=preview)
+                    filename, derivatives = save_image(file)
+                    img = ProductImage(product_id=product.id, filename=filename)
+                    if derivatives:
+                        img.preview_filename = derivatives["preview"]
+                        img.variants = derivatives["variants"]
+                        img.status = "ready"
+                    else:
+                        img.status = "pending"
                     db.session.add(img)
                 except Exception as e:
                     flash(f"Помилка завантаження фото: {e}")
 
         db.session.commit()
+        page_cache.invalidate_product(product.id)
+        fragment_cache.invalidate("product", product.id)
         flash("Дані збережено!")
         return redirect(url_for("admin.product_edit", product_id=product.id))
 
@@ -117,29 +171,23 @@ def product_edit(product_id=None):
 @login_required
 def color_delete(color_id):
     c = Color.query.get_or_404(color_id)
+    product_id = c.product_id
     db.session.delete(c); db.session.commit()
+    page_cache.invalidate_product(product_id)
+    fragment_cache.invalidate("product", product_id)
     return {"status": "success"}
 
 @bp.route("/images/<int:image_id>/delete", methods=["POST"])
 @login_required
 def image_delete(image_id):
     img = ProductImage.query.get_or_404(image_id)
-    # шлях до файлу
-    upload_folder = os.path.join(current_app.static_folder, "img/uploads")
-    file_path = os.path.join(upload_folder, img.filename)
-    preview_path = os.path.join(upload_folder, img.preview_filename)
-
-    # пробуємо видалити основний файл
-    if os.path.exists(file_path):
-        os.remove(file_path)
-
-    # пробуємо видалити прев’ю
-    if os.path.exists(preview_path):
-        os.remove(preview_path)
-
-    # видаляємо запис з БД
+    product_id, filename = img.product_id, img.filename
 
+    # видаляємо запис з БД; файли — лише якщо фото більше ніде не використовується
     db.session.delete(img); db.session.commit()
+    release_images([filename])
+    page_cache.invalidate_product(product_id)
+    fragment_cache.invalidate("product", product_id)
     return {"status": "success"}
 
 # Видалення продукту
@@ -148,17 +196,10 @@ def image_delete(image_id):
 def product_delete(product_id):
     product = Product.query.get_or_404(product_id)
 
-    # Видаляємо пов’язані зображення з диску
-    upload_folder = os.path.join(current_app.static_folder, "img/uploads")
+    # Видаляємо пов’язані зображення (файли — після commit, якщо на них більше немає посилань)
+    filenames = []
     for img in ProductImage.query.filter_by(product_id=product.id).all():
-        file_path = os.path.join(upload_folder, img.filename)
-        preview_path = os.path.join(upload_folder, img.preview_filename)
-
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        if os.path.exists(preview_path):
-            os.remove(preview_path)
-
+        filenames.append(img.filename)
         db.session.delete(img)
 
     # Видаляємо пов’язані кольори
@@ -166,15 +207,57 @@ def product_delete(product_id):
 
     db.session.delete(product)
     db.session.commit()
+    release_images(filenames)
+    page_cache.invalidate_product(product_id)
+    fragment_cache.invalidate("product", product_id)
     flash("Продукт успішно видалено!")
     return redirect(url_for("admin.product_list"))
 
-# Список замовлень
+# Список замовлень: сторінки за keyset-курсором або весь діапазон потоком (?stream=1)
 @bp.route("/orders")
+@query_budget(3)
 @login_required
 def order_list():
-    orders = Order.query.order_by(Order.created_at.desc()).all()
-    return render_template("admin/order_list.html", orders=orders)
+    filters = parse_order_filters(request.args)
+    context = dict(filters=filters, statuses=ORDER_STATUSES, contact_methods=CONTACT_METHODS)
+    if request.args.get("stream"):
+        # HTML віддається частинами в міру читання пачок — пам'ять не залежить від діапазону
+        return current_app.response_class(stream_with_context(
+            stream_template("admin/order_list.html", rows=iter_orders(filters), next_cursor=None,
+                            streaming=True, **context)
+        ))
+    rows, next_cursor = load_orders_page(filters, request.args.get("cursor"),
+                                         current_app.config["ADMIN_ORDERS_PAGE_SIZE"])
+    return render_template("admin/order_list.html", rows=rows, next_cursor=next_cursor,
+                           streaming=False, **context)
+
+# Ті самі замовлення JSON-масивом, потоком
+@bp.route("/orders.json")
+@login_required
+def order_list_json():
+    filters = parse_order_filters(request.args)
+
+    def generate():
+        yield "["
+        for i, (order, items) in enumerate(iter_orders(filters)):
+            yield ("," if i else "") + json.dumps(order_to_dict(order, items), ensure_ascii=False)
+        yield "]"
+
+    return current_app.response_class(stream_with_context(generate()), mimetype="application/json")
+
+# Експорт замовлень із позиціями для бухгалтерії/доставки: CSV або JSONL, потоком
+@bp.route("/orders/export")
+@login_required
+def order_export():
+    filters = parse_order_filters(request.args)
+    fmt = request.args.get("format") if request.args.get("format") in FORMATS else "csv"
+    filename = f"orders-{datetime.utcnow():%Y%m%d-%H%M}.{fmt}"
+    response = current_app.response_class(
+        stream_with_context(export_orders(filters, fmt, bom=fmt == "csv")),
+        mimetype=FORMATS[fmt],
+    )
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
 
 # CRUD для Composition
 @bp.route("/compositions")
@@ -193,11 +276,12 @@ def composition_new():
         filename = None
         if file and file.filename:
             try:
-                filename, preview = save_image(file)
+                filename, _ = save_image(file, derivatives=False)
             except Exception as e:
                 flash(f"Помилка завантаження: {e}")
         comp = Composition(title=title, description=description, image=filename, is_active=bool(request.form.get("is_active")))
         db.session.add(comp); db.session.commit()
+        page_cache.invalidate_compositions()
         return redirect(url_for("admin.composition_list"))
     return render_template("admin/composition_form.html", composition=None)
 
@@ -210,13 +294,17 @@ def composition_edit(comp_id):
         comp.description = request.form.get("description", comp.description)
         comp.is_active = bool(request.form.get("is_active"))
         file = request.files.get("image")
+        replaced = None
         if file and file.filename:
             try:
-                filename, preview = save_image(file)
-                comp.image = filename
+                filename, _ = save_image(file, derivatives=False)
+                replaced, comp.image = comp.image, filename
             except Exception as e:
                 flash(f"Помилка завантаження: {e}")
         db.session.commit()
+        # попереднє фото більше не потрібне, якщо на нього ніхто не посилається
+        release_images([replaced])
+        page_cache.invalidate_compositions()
         return redirect(url_for("admin.composition_list"))
     return render_template("admin/composition_form.html", composition=comp)
 
@@ -224,21 +312,11 @@ def composition_edit(comp_id):
 @login_required
 def composition_delete(comp_id):
     comp = Composition.query.get_or_404(comp_id)
+    filename = comp.image
 
-    upload_folder = os.path.join(current_app.static_folder, "img/uploads")
-
-    # основне зображення
-    if comp.image:
-        file_path = os.path.join(upload_folder, comp.image)
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        preview_name = f"preview_{comp.image}"
-        preview_path = os.path.join(upload_folder, preview_name)
-        if os.path.exists(preview_path):
-            os.remove(preview_path)
-
-    # видалення запису з БД
-
+    # видалення запису з БД, потім файлів — якщо фото не використовується деінде
     db.session.delete(comp); db.session.commit()
+    release_images([filename])
+    page_cache.invalidate_compositions()
     flash("Композицію успішно видалено!")
     return redirect(url_for("admin.composition_list"))
\ No newline at end of file
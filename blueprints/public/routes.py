@@ -1,35 +1,81 @@
 # blueprints/public/routes.py
-from flask import render_template
-from models import Product, Composition
+from flask import render_template, request, current_app, url_for, abort
+from extensions import page_cache
+from services.catalog import (SORTS, catalog_cache_key, parse_filters, load_catalog_page, load_facets,
+                              load_compositions, load_product_detail)
+from services.search import search_page, suggest
+from services.http_cache import conditional
+from services.query_budget import query_budget
+from services.revision import catalog_stamp, product_stamp
 from blueprints.public import bp
 
 # Головна сторінка сайту
 @bp.route("/")
+@conditional(catalog_stamp)
+@page_cache.cached("index")
 def index():
-    # Вибираємо всі активні композиції з БД, сортуємо за датою створення (новіші першими)
-    compositions = Composition.query.filter_by(is_active=True).order_by(Composition.created_at.desc()).all()
+    # Усі активні композиції, новіші першими (зі знімка каталогу або з БД)
+    compositions = load_compositions()
     return render_template("public/index.html", compositions=compositions)
 
 # Сторінка зі списком композицій
 @bp.route("/compositions")
+@conditional(catalog_stamp)
+@page_cache.cached("compositions")
 def compositions():
-    compositions = Composition.query.filter_by(is_active=True).order_by(Composition.created_at.desc()).all()
+    compositions = load_compositions()
     return render_template("public/compositions.html", compositions=compositions)
 
 # Сторінка FAQ (часті питання)
 @bp.route("/faq")
+@conditional(lambda: ("faq", None))  # змінюється лише з релізом (CACHE_VERSION)
+@page_cache.cached("faq")
 def faq():
     return render_template("public/faq.html")
 
 # Каталог товарів
 @bp.route("/catalog")
+@query_budget(8)
+@conditional(catalog_stamp)
+@page_cache.cached("catalog", key=lambda: catalog_cache_key(request.args))
 def catalog():
-    products = Product.query.filter_by(is_active=True).all()
-    return render_template("public/catalog.html", products=products)
+    # Сторінка за keyset-курсором + фасети; кількість запитів не залежить від розміру каталогу
+    filters = parse_filters(request.args)
+    sort = request.args.get("sort") if request.args.get("sort") in SORTS else "new"
+    cards, next_cursor = load_catalog_page(
+        filters, sort, request.args.get("cursor"), current_app.config["CATALOG_PAGE_SIZE"]
+    )
+    facets = load_facets(filters)
+    return render_template("public/catalog.html", cards=cards, next_cursor=next_cursor,
+                           facets=facets, filters=filters, sort=sort)
+
+# Пошук товарів (FTS5, ранжування bm25); без кешу сторінок — варіантів запиту необмежено
+@bp.route("/search")
+@conditional(catalog_stamp)
+def search():
+    q = request.args.get("q", "").strip()
+    page = request.args.get("page", 1, type=int)
+    cards, has_next = search_page(q, page, current_app.config["CATALOG_PAGE_SIZE"]) if q else ([], False)
+    return render_template("public/search.html", q=q, cards=cards, page=page, has_next=has_next)
+
+# Автодоповнення для поля пошуку в шапці
+@bp.route("/search/suggest")
+@conditional(catalog_stamp)
+def search_suggest():
+    q = request.args.get("q", "").strip()
+    results = suggest(q) if len(q) >= 2 else []
+    for item in results:
+        item["url"] = url_for("public.product_detail", product_id=item["id"])
+    return {"query": q, "results": results}
 
 # Детальна сторінка товару
 @bp.route("/product/<int:product_id>")
+@query_budget(4)
+@conditional(product_stamp)
+@page_cache.cached("product", key=lambda product_id: product_id)
 def product_detail(product_id):
-    product = Product.query.get_or_404(product_id)
-    colors = [c.to_dict() for c in product.colors]
-    return render_template("public/product_detail.html", product=product, colors=colors)
\ No newline at end of file
+    detail = load_product_detail(product_id)
+    if detail is None:
+        abort(404)
+    product, colors, price = detail
+    return render_template("public/product_detail.html", product=product, colors=colors, price=price)
\ No newline at end of file
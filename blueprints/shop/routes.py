@@ -1,42 +1,28 @@
 # blueprints/shop/routes.py
 from flask import render_template, request, redirect, url_for, jsonify
-from extensions import db
-from models import Product, Color, Order, OrderItem
-from services.cart import CartService
+from models import Product, Color, Order
+from services.cart import CartService, hydrate_cart
+from services.orders import place_order
+from services.query_budget import query_budget
 from . import bp
 
-# Допоміжна функція для ціни з урахуванням кольору
-def price_with_color(product, color):
-    # Якщо колір має ціновий модифікатор, додаємо його до базової ціни
-    modifier = color.price_modifier if color else 0.0
-    return round(product.price * (1 + modifier), 2)
-
 # Сторінка кошика
 @bp.route("/cart")
+@query_budget(5)
 def cart():
-    cart = CartService.get()
-    items = []
-    total = 0.0
-    for i, it in enumerate(cart):
-        product = Product.query.get(it["product_id"])
-        if not product:
-            continue
-        color = Color.query.get(it.get("color_id")) if it.get("color_id") else None
-        price = it["unit_price"] or price_with_color(product, color)
-        subtotal = price * it["quantity"]
-        total += subtotal
-        cover = product.images[0] if product.images else None
-        items.append({
-            "index": i,
-            "product": product,
-            "color": color,
-            "quantity": it["quantity"],
-            "unit_price": price,
-            "subtotal": subtotal,
-            "cover": cover
-        })
+    items, total = hydrate_cart()
     return render_template("shop/cart.html", items=items, total=total)
 
+def _cart_state(cart):
+    # Стан кошика для JSON-відповідей: сторінка оновлює суми без перезавантаження
+    items, total = hydrate_cart(cart, with_covers=False)
+    return {
+        "ok": True,
+        "lines": {it["line_id"]: {"quantity": it["quantity"], "subtotal": round(it["subtotal"], 2)} for it in items},
+        "total": round(total, 2),
+        "count": sum(it["quantity"] for it in items),
+    }
+
 # Додавання товару до кошика
 @bp.route("/cart/add", methods=["POST"])
 def cart_add():
@@ -45,24 +31,38 @@ def cart_add():
     color_id = data.get("color_id")
     color = Color.query.get(color_id) if color_id else None
     qty = max(1, int(data.get("quantity", 1)))
-    price = price_with_color(product, color)
-    CartService.add(product.id, color.id if color else None, qty, price)
-    return jsonify({"ok": True})
+    key = CartService.add(product.id, color.id if color and color.product_id == product.id else None, qty)
+    return jsonify({"ok": True, "line_id": key})
+
+# Пакетне оновлення кількостей: {"lines": {"<line_id>": кількість, ...}}, 0 — видалити
+@bp.route("/cart/update", methods=["POST"])
+def cart_update_many():
+    changes = (request.get_json(silent=True) or {}).get("lines")
+    if not isinstance(changes, dict):
+        return jsonify({"ok": False, "error": "Очікується об'єкт lines"}), 400
+    try:
+        changes = {str(key): max(0, int(qty)) for key, qty in changes.items()}
+    except (TypeError, ValueError):
+        return jsonify({"ok": False, "error": "Кількість має бути цілим числом"}), 400
+    return jsonify(_cart_state(CartService.update_many(changes)))
 
-# Оновлення кількості товару в кошику
-@bp.route("/cart/update/<int:index>", methods=["POST"])
-def cart_update(index):
-    qty = request.get_json().get("quantity", 1)
-    CartService.update_quantity(index, qty)
-    return jsonify({"ok": True})
+# Оновлення кількості одного рядка кошика
+@bp.route("/cart/update/<line_id>", methods=["POST"])
+def cart_update(line_id):
+    data = request.get_json(silent=True)
+    try:
+        qty = int(data.get("quantity", 1) if isinstance(data, dict) else 1)
+    except (TypeError, ValueError):
+        return jsonify({"ok": False, "error": "Кількість має бути цілим числом"}), 400
+    return jsonify(_cart_state(CartService.update_quantity(line_id, qty)))
 
-# Видалення товару з кошика
-@bp.route("/cart/remove/<int:index>", methods=["POST"])
-def cart_remove(index):
-    CartService.remove(index)
-    return jsonify({"ok": True})
+# Видалення рядка з кошика
+@bp.route("/cart/remove/<line_id>", methods=["POST"])
+def cart_remove(line_id):
+    return jsonify(_cart_state(CartService.remove(line_id)))
 
 @bp.route("/checkout", methods=["GET", "POST"])
+@query_budget(9)
 def checkout():
     if request.method == "POST":
         form = request.form
@@ -71,38 +71,10 @@ def checkout():
             # Якщо кошик порожній — повертаємо на сторінку кошика
             return redirect(url_for("shop.cart"))
 
-        # Створюємо нове замовлення
-        order = Order(
-            customer_name=form.get("name"),
-            phone=form.get("phone"),
-            contact_method=form.get("contact_method"),
-            address=form.get("address"),
-            comment=form.get("comment"),
-            status="new",
-        )
-        db.session.add(order)
-        db.session.flush()
-
-        # Додаємо товари до замовлення
-        total = 0.0
-        for it in cart:
-            product = Product.query.get(it["product_id"])
-            color = Color.query.get(it.get("color_id")) if it.get("color_id") else None
-            if not product:
-                continue
-            price = it["unit_price"]
-            db.session.add(OrderItem(
-                order_id=order.id,
-                product_id=product.id,
-                color_id=color.id if color else None,
-                quantity=it["quantity"],
-                unit_price=price
-            ))
-            total += price * it["quantity"]
-
-        # Записуємо загальну суму замовлення
-        order.total_amount = total
-        db.session.commit()
+        # Перевірка кошика і запис замовлення однією короткою транзакцією
+        order = place_order(form, cart)
+        if not order:
+            return redirect(url_for("shop.cart"))
         CartService.clear()
         return redirect(url_for("shop.order_success", order_id=order.id))
 
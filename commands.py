@@ -0,0 +1,222 @@
+# commands.py
+import os, time
+from concurrent.futures import ProcessPoolExecutor
+import click
+from flask.cli import AppGroup
+
+images_cli = AppGroup("images", help="Обробка завантажених фото")
+search_cli = AppGroup("search", help="Повнотекстовий пошук товарів")
+orders_cli = AppGroup("orders", help="Замовлення")
+catalog_cli = AppGroup("catalog", help="Каталог товарів")
+cart_cli = AppGroup("cart", help="Кошики покупців")
+analytics_cli = AppGroup("analytics", help="Аналітика продажів")
+
+
+def register_commands(app):
+    app.cli.add_command(images_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(orders_cli)
+    app.cli.add_command(catalog_cli)
+    app.cli.add_command(cart_cli)
+    app.cli.add_command(analytics_cli)
+
+
+def _drain_queue(executor, batch, on_batch=None):
+    # Обробити задачі з черги, доки вона не спорожніє; повертає (успішно, з помилками)
+    from services.image_jobs import claim_jobs, run_jobs
+
+    total_done = total_failed = 0
+    while True:
+        jobs = claim_jobs(limit=batch)
+        if not jobs:
+            return total_done, total_failed
+        done, failed = run_jobs(jobs, executor)
+        total_done += done
+        total_failed += failed
+        if on_batch:
+            on_batch(total_done, total_failed)
+
+
+@images_cli.command("worker")
+@click.option("--once", is_flag=True, help="Обробити всі наявні задачі й завершитись")
+@click.option("--processes", type=int, default=os.cpu_count() or 1, show_default=True)
+@click.option("--poll", type=float, default=2.0, show_default=True, help="Пауза між перевірками черги, с")
+def images_worker(once, processes, poll):
+    # Споживач черги ImageJob: генерує прев’ю поза запитами адмінки
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        while True:
+            started = time.perf_counter()
+            done, failed = _drain_queue(executor, processes * 2)
+            if done or failed:
+                click.echo(f"Оброблено {done}, помилок {failed} за {time.perf_counter() - started:.2f} с")
+            if once:
+                break
+            time.sleep(poll)
+
+
+@images_cli.command("gc")
+@click.option("--delete", is_flag=True, help="Справді видалити (без прапорця — лише звіт)")
+@click.option("--min-age", type=int, default=3600, show_default=True,
+              help="Не чіпати файли, новіші за стільки секунд")
+def images_gc(delete, min_age):
+    # Файли в UPLOAD_FOLDER, на які не посилається жоден ProductImage/Composition
+    from services.upload_maintenance import find_orphans
+
+    started = time.perf_counter()
+    count = size = 0
+    for path, file_size in find_orphans(min_age=min_age):
+        count += 1
+        size += file_size
+        if delete:
+            try:
+                os.remove(path)
+            except OSError as e:
+                click.echo(f"Не вдалося видалити {path}: {e}", err=True)
+                continue
+        else:
+            click.echo(path)
+        if count % 1000 == 0:
+            click.echo(f"... {count} файлів", err=True)
+    action = "Видалено" if delete else "Знайдено (dry-run)"
+    click.echo(f"{action}: {count} файлів, {size / 1024 / 1024:.1f} МБ за {time.perf_counter() - started:.2f} с")
+
+
+@images_cli.command("backfill")
+@click.option("--dry-run", is_flag=True, help="Лише показати, що буде оброблено")
+@click.option("--processes", type=int, default=os.cpu_count() or 1, show_default=True)
+@click.option("--enqueue-only", is_flag=True, help="Лише поставити в чергу для `flask images worker`")
+def images_backfill(dry_run, processes, enqueue_only):
+    # Догенерувати відсутні прев’ю й адаптивні похідні паралельно в пулі процесів
+    from extensions import db
+    from services.images import enqueue_derivatives
+    from services.upload_maintenance import images_needing_derivatives
+
+    started = time.perf_counter()
+    queued = missing = 0
+    for filename, original_exists in images_needing_derivatives():
+        if not original_exists:
+            missing += 1
+            click.echo(f"Немає оригіналу: {filename}", err=True)
+            continue
+        queued += 1
+        if dry_run:
+            click.echo(filename)
+        else:
+            enqueue_derivatives(filename)
+    db.session.commit()
+    click.echo(f"До обробки: {queued}, без оригіналу: {missing}")
+    if dry_run or enqueue_only or not queued:
+        return
+
+    def progress(done, failed):
+        click.echo(f"... {done + failed}/{queued} за {time.perf_counter() - started:.1f} с", err=True)
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        done, failed = _drain_queue(executor, processes * 4, on_batch=progress)
+    click.echo(f"Готово: {done}, помилок {failed} за {time.perf_counter() - started:.2f} с")
+
+
+@search_cli.command("rebuild")
+def search_rebuild():
+    # Перестворити FTS5-індекс і тригери (БД після create_all, ручні зміни таблиць product/color)
+    from services.search import fts_enabled, rebuild_index
+
+    if not fts_enabled():
+        click.echo("FTS5 доступний лише для SQLite; на цій БД пошук працює через ILIKE")
+        return
+    started = time.perf_counter()
+    count = rebuild_index()
+    click.echo(f"Проіндексовано {count} товарів за {time.perf_counter() - started:.2f} с")
+
+
+@orders_cli.command("export")
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default="csv", show_default=True)
+@click.option("--output", "-o", type=click.Path(dir_okay=False, writable=True), default="-",
+              show_default=True, help="Файл або - для stdout")
+@click.option("--status")
+@click.option("--contact-method")
+@click.option("--date-from", help="YYYY-MM-DD")
+@click.option("--date-to", help="YYYY-MM-DD, включно")
+@click.option("--batch", type=int, default=1000, show_default=True, help="Рядків на пачку курсора")
+def orders_export(fmt, output, status, contact_method, date_from, date_to, batch):
+    # Замовлення з позиціями (SKU, колір) потоком: пам'ять стала для будь-якого діапазону
+    from services.order_export import export_orders
+    from services.orders import parse_order_filters
+
+    filters = parse_order_filters({"status": status, "contact_method": contact_method,
+                                   "date_from": date_from, "date_to": date_to})
+    started = time.perf_counter()
+    with click.open_file(output, "w", encoding="utf-8", lazy=False) as fh:
+        for chunk in export_orders(filters, fmt, batch_size=batch):
+            fh.write(chunk)
+    if output != "-":
+        click.echo(f"Експорт у {output} за {time.perf_counter() - started:.2f} с", err=True)
+
+
+@catalog_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl", "json"]), help="За замовчуванням — за розширенням")
+@click.option("--images-dir", type=click.Path(exists=True, file_okay=False), help="Тека з фото, на які посилається файл")
+@click.option("--chunk-size", type=int, default=200, show_default=True, help="Товарів на транзакцію")
+@click.option("--errors", "errors_path", type=click.Path(dir_okay=False, writable=True), help="CSV-звіт про помилки")
+@click.option("--dry-run", is_flag=True, help="Перевірити файл і upsert без збереження")
+@click.option("--process", "processes", type=int, default=0,
+              help="Одразу обробити фото в пулі з N процесів (інакше — `flask images worker`)")
+def catalog_import(path, fmt, images_dir, chunk_size, errors_path, dry_run, processes):
+    # Масовий upsert товарів за sku з кольорами й фото; рядки з помилками — у звіт
+    from services.catalog_import import detect_format, import_catalog, write_error_report
+
+    fmt = fmt or detect_format(path)
+    if not fmt:
+        raise click.UsageError("Не вдалося визначити формат файлу, вкажіть --format")
+    started = time.perf_counter()
+
+    def progress(report):
+        click.echo(f"... {report.imported} товарів, помилок {len(report.errors)} "
+                   f"за {time.perf_counter() - started:.1f} с", err=True)
+
+    with open(path, encoding="utf-8-sig", newline="") as fh:
+        report = import_catalog(fh, fmt, images_dir=images_dir, chunk_size=chunk_size,
+                                dry_run=dry_run, on_chunk=progress)
+
+    action = "Перевірено (dry-run)" if dry_run else "Імпортовано"
+    click.echo(f"{action}: нових {report.created}, оновлено {report.updated}, кольорів {report.colors}, "
+               f"фото {report.images} (у черзі {report.queued}), помилок {len(report.errors)} "
+               f"за {time.perf_counter() - started:.2f} с")
+    if report.errors:
+        if errors_path:
+            with open(errors_path, "w", encoding="utf-8", newline="") as fh:
+                write_error_report(report, fh)
+            click.echo(f"Звіт про помилки: {errors_path}")
+        else:
+            for line, sku, message in report.errors[:20]:
+                click.echo(f"  рядок {line} [{sku}]: {message}", err=True)
+            if len(report.errors) > 20:
+                click.echo(f"  ... ще {len(report.errors) - 20}, див. --errors", err=True)
+
+    if processes and report.queued and not dry_run:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            done, failed = _drain_queue(executor, processes * 4)
+        click.echo(f"Фото оброблено: {done}, помилок {failed} за {time.perf_counter() - started:.2f} с")
+
+
+@cart_cli.command("purge")
+def cart_purge():
+    # Видалити прострочені серверні кошики (CART_TTL); запускати з cron раз на добу
+    from extensions import cart_store
+
+    started = time.perf_counter()
+    removed = cart_store.purge()
+    click.echo(f"Видалено кошиків: {removed} за {time.perf_counter() - started:.2f} с")
+
+
+@analytics_cli.command("rebuild")
+@click.option("--since", type=click.DateTime(formats=["%Y-%m-%d"]), help="YYYY-MM-DD; без нього — уся історія")
+def analytics_rebuild(since):
+    # Перерахувати sales_daily/sales_day із замовлень: після міграції або ручних правок у order/order_item
+    from services.analytics import rebuild
+
+    started = time.perf_counter()
+    stats = rebuild(since.date() if since else None)
+    click.echo(f"Замовлень: {stats['orders']}, днів: {stats['days']}, рядків: {stats['rows']} "
+               f"за {time.perf_counter() - started:.2f} с")
@@ -1,9 +1,97 @@
 # config.py
 import os
+from sqlalchemy.engine import make_url
+
+# Параметри пулу, які можна передати в query string DATABASE_URL (?pool_size=10&pool_pre_ping=1)
+POOL_URL_PARAMS = {"pool_size": int, "max_overflow": int, "pool_timeout": int, "pool_recycle": int,
+                   "pool_pre_ping": lambda v: v.lower() in ("1", "true", "yes", "on")}
+
+
+def database_settings(url):
+    # postgres:// (Heroku/Render) -> postgresql://, бо SQLAlchemy 2 знає лише друге ім'я
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return url, {}
+
+    # Пул для PostgreSQL: значення з env, параметри в URL мають пріоритет
+    options = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 5)),
+        "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "1") == "1",
+    }
+    query = dict(parsed.query)
+    for name, cast in POOL_URL_PARAMS.items():
+        if name in query:
+            options[name] = cast(query.pop(name))
+    return parsed.set(query=query).render_as_string(hide_password=False), options
+
+
+DATABASE_URI, ENGINE_OPTIONS = database_settings(os.environ.get("DATABASE_URL", "sqlite:///candles.db"))
+
 
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY")
-    SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", "sqlite:///candles.db")
+    SQLALCHEMY_DATABASE_URI = DATABASE_URI
+    SQLALCHEMY_ENGINE_OPTIONS = ENGINE_OPTIONS
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # PRAGMA для кожного нового з'єднання SQLite; SQLITE_TUNING=0 — стандартні налаштування SQLite
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",          # читачі не блокують запис і навпаки
+        "synchronous": "NORMAL",        # у WAL безпечно: fsync лише на checkpoint
+        "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),  # мс очікування блокування
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -16000,           # ~16 МБ сторінкового кешу на з'єднання
+        "temp_store": "MEMORY",
+    } if os.environ.get("SQLITE_TUNING", "1") == "1" else {}
     MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10MB upload limit
-    UPLOAD_FOLDER = "static/img/uploads"
\ No newline at end of file
+    UPLOAD_FOLDER = "static/img/uploads"
+    # Каталог: розмір сторінки і цінові діапазони для фасетів (грн, "до" не включно)
+    CATALOG_PAGE_SIZE = int(os.environ.get("CATALOG_PAGE_SIZE", 24))
+    CATALOG_PRICE_BANDS = [(0, 200), (200, 500), (500, 1000), (1000, None)]
+    # Знімок каталогу в пам'яті процесу (services/snapshot.py); 0 — публічні сторінки читають БД напряму
+    CATALOG_SNAPSHOT = os.environ.get("CATALOG_SNAPSHOT", "1") == "1"
+    # Кеш готових публічних сторінок: memory (LRU у процесі), filesystem (спільний для воркерів) або null
+    PAGE_CACHE_BACKEND = os.environ.get("PAGE_CACHE_BACKEND", "memory")
+    PAGE_CACHE_TTL = int(os.environ.get("PAGE_CACHE_TTL", 300))
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get("PAGE_CACHE_MAX_ENTRIES", 512))  # на процес (memory) або на теку
+    PAGE_CACHE_DIR = os.environ.get("PAGE_CACHE_DIR")  # за замовчуванням instance/page_cache
+    # Кеш фрагментів шаблонів ({% cache %}): memory або null; ключ містить штамп сутності
+    FRAGMENT_CACHE_BACKEND = os.environ.get("FRAGMENT_CACHE_BACKEND", "memory")
+    FRAGMENT_CACHE_TTL = int(os.environ.get("FRAGMENT_CACHE_TTL", 24 * 3600))
+    FRAGMENT_CACHE_MAX_ENTRIES = int(os.environ.get("FRAGMENT_CACHE_MAX_ENTRIES", 4096))
+    # HTTP-кеш: ETag/Last-Modified для публічних сторінок; CACHE_VERSION змінювати при релізі шаблонів
+    HTTP_CACHE_MAX_AGE = int(os.environ.get("HTTP_CACHE_MAX_AGE", 0))
+    CACHE_VERSION = os.environ.get("CACHE_VERSION", "1")
+    # Обробка фото: sync — прев’ю в запиті адмінки; queue — у фоні через `flask images worker`
+    IMAGE_PROCESSING = os.environ.get("IMAGE_PROCESSING", "sync")
+    IMAGE_JOB_MAX_ATTEMPTS = 3
+    IMAGE_JOB_STALE_SECONDS = 600
+    # release_images не видаляє оригінал, збережений (або повторно завантажений) недавніше за це
+    IMAGE_RELEASE_GRACE_SECONDS = 600
+    # Адаптивні похідні: ширини (px) і формати поряд із JPEG-запасним ("webp", "avif")
+    IMAGE_WIDTHS = (320, 640, 1024, 1600)
+    IMAGE_FORMATS = tuple(f for f in os.environ.get("IMAGE_FORMATS", "webp").split(",") if f)
+    IMAGE_QUALITY = 80
+    # Кошик: sql (таблиця cart_session) або filesystem — у cookie лише id; cookie — увесь кошик у cookie.
+    # Прострочені кошики видаляє `flask cart purge` (cron)
+    CART_BACKEND = os.environ.get("CART_BACKEND", "sql")
+    CART_TTL = int(os.environ.get("CART_TTL", 30 * 24 * 3600))
+    CART_DIR = os.environ.get("CART_DIR")  # за замовчуванням instance/carts
+    # Імпорт каталогу з адмінки: тека на сервері, звідки беруться фото, вказані у файлі
+    IMPORT_IMAGES_DIR = os.environ.get("IMPORT_IMAGES_DIR")
+    # Інструментування (services/instrumentation.py): час запиту, рендерингу і SQL за маршрутами,
+    # метрики Prometheus на /admin/metrics (адмін або Bearer METRICS_TOKEN), cProfile за X-Profile: PROFILE_TOKEN
+    INSTRUMENTATION = os.environ.get("INSTRUMENTATION", "0") == "1"
+    SLOW_QUERY_MS = int(os.environ.get("SLOW_QUERY_MS", 200))
+    SLOW_REQUEST_QUERIES = int(os.environ.get("SLOW_REQUEST_QUERIES", 50))
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+    PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN")
+    PROFILE_DIR = os.environ.get("PROFILE_DIR")  # за замовчуванням instance/profiles
+    # Бюджет SQL на запит для в'юх з @query_budget: 1/0 — увімкнути/вимкнути, не задано — лише в debug
+    QUERY_BUDGET = {"1": True, "0": False}.get(os.environ.get("QUERY_BUDGET"))
+    # Адмінка: замовлень на сторінці (повний діапазон — потоком через ?stream=1 або /admin/orders.json)
+    ADMIN_ORDERS_PAGE_SIZE = int(os.environ.get("ADMIN_ORDERS_PAGE_SIZE", 50))
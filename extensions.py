@@ -2,10 +2,16 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
+from services.page_cache import PageCache
+from services.cart_store import CartStore
+from services.fragment_cache import FragmentCache
 
 db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
+page_cache = PageCache()
+cart_store = CartStore()
+fragment_cache = FragmentCache()
 login_manager.login_view = "admin.login"
 
 from models import User
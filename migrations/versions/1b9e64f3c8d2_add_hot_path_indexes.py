@@ -0,0 +1,50 @@
+"""Add indexes for hot query paths
+
+Revision ID: 1b9e64f3c8d2
+Revises: f27c9a0e4b15
+Create Date: 2026-10-19 10:18:55.203417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b9e64f3c8d2'
+down_revision = 'f27c9a0e4b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('color', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_color_product_id'), ['product_id'], unique=False)
+
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.create_index('ix_product_image_product_sort', ['product_id', 'sort_order', 'id'], unique=False)
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_created_at'), ['created_at'], unique=False)
+
+    with op.batch_alter_table('order_item', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_item_order_id'), ['order_id'], unique=False)
+
+    with op.batch_alter_table('composition', schema=None) as batch_op:
+        batch_op.create_index('ix_composition_active_created', ['is_active', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('composition', schema=None) as batch_op:
+        batch_op.drop_index('ix_composition_active_created')
+
+    with op.batch_alter_table('order_item', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_item_order_id'))
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_created_at'))
+
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_image_product_sort')
+
+    with op.batch_alter_table('color', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_color_product_id'))
@@ -0,0 +1,74 @@
+"""Add product_search FTS5 index with sync triggers
+
+Revision ID: 5c8e2a7f9d31
+Revises: 1b9e64f3c8d2
+Create Date: 2026-10-19 14:02:37.618204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c8e2a7f9d31'
+down_revision = '1b9e64f3c8d2'
+branch_labels = None
+depends_on = None
+
+
+# FTS5 є лише в SQLite; на PostgreSQL пошук працює через ILIKE (services/search.py)
+SCHEMA = [
+    """CREATE VIRTUAL TABLE product_search USING fts5(
+        name, description, category, wax_type, colors,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')""",
+    """CREATE TRIGGER product_search_ai AFTER INSERT ON product BEGIN
+        INSERT INTO product_search (rowid, name, description, category, wax_type, colors)
+        VALUES (new.id, new.name, new.description, new.category, new.wax_type,
+                (SELECT group_concat(color_name, ' ') FROM color WHERE product_id = new.id));
+    END""",
+    """CREATE TRIGGER product_search_au
+    AFTER UPDATE OF name, description, category, wax_type ON product BEGIN
+        UPDATE product_search SET name = new.name, description = new.description,
+            category = new.category, wax_type = new.wax_type
+        WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER product_search_ad AFTER DELETE ON product BEGIN
+        DELETE FROM product_search WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER color_search_ai AFTER INSERT ON color BEGIN
+        UPDATE product_search
+        SET colors = (SELECT group_concat(color_name, ' ') FROM color WHERE product_id = new.product_id)
+        WHERE rowid = new.product_id;
+    END""",
+    """CREATE TRIGGER color_search_au AFTER UPDATE OF color_name, product_id ON color BEGIN
+        UPDATE product_search
+        SET colors = (SELECT group_concat(color_name, ' ') FROM color WHERE product_id = product_search.rowid)
+        WHERE rowid IN (old.product_id, new.product_id);
+    END""",
+    """CREATE TRIGGER color_search_ad AFTER DELETE ON color BEGIN
+        UPDATE product_search
+        SET colors = (SELECT group_concat(color_name, ' ') FROM color WHERE product_id = old.product_id)
+        WHERE rowid = old.product_id;
+    END""",
+    """INSERT INTO product_search (rowid, name, description, category, wax_type, colors)
+    SELECT p.id, p.name, p.description, p.category, p.wax_type,
+           (SELECT group_concat(c.color_name, ' ') FROM color c WHERE c.product_id = p.id)
+    FROM product p""",
+    "INSERT INTO product_search (product_search) VALUES ('optimize')",
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in SCHEMA:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in ('color_search_ad', 'color_search_au', 'color_search_ai',
+                    'product_search_ad', 'product_search_au', 'product_search_ai'):
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS product_search')
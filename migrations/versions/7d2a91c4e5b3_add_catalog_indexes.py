@@ -0,0 +1,32 @@
+"""Add catalog filter and keyset indexes
+
+Revision ID: 7d2a91c4e5b3
+Revises: 4b6344bfd446
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2a91c4e5b3'
+down_revision = '4b6344bfd446'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.create_index('ix_product_active_id', ['is_active', 'id'], unique=False)
+        batch_op.create_index('ix_product_active_category', ['is_active', 'category', 'id'], unique=False)
+        batch_op.create_index('ix_product_active_wax_type', ['is_active', 'wax_type', 'id'], unique=False)
+        batch_op.create_index('ix_product_active_price', ['is_active', 'price', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_active_price')
+        batch_op.drop_index('ix_product_active_wax_type')
+        batch_op.drop_index('ix_product_active_category')
+        batch_op.drop_index('ix_product_active_id')
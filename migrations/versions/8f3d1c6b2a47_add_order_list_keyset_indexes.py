@@ -0,0 +1,32 @@
+"""Add keyset and filter indexes for the admin order list
+
+Revision ID: 8f3d1c6b2a47
+Revises: 5c8e2a7f9d31
+Create Date: 2026-10-19 16:41:09.537712
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3d1c6b2a47'
+down_revision = '5c8e2a7f9d31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_created_at')
+        batch_op.create_index('ix_order_created_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_order_status_created', ['status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_order_contact_created', ['contact_method', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_contact_created')
+        batch_op.drop_index('ix_order_status_created')
+        batch_op.drop_index('ix_order_created_id')
+        batch_op.create_index('ix_order_created_at', ['created_at'], unique=False)
@@ -0,0 +1,41 @@
+"""Add sales_daily and sales_day rollup tables for admin analytics
+
+Revision ID: 9c4e1a7d3f62
+Revises: d27f4b8e1c53
+Create Date: 2026-10-21 11:02:47.518305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e1a7d3f62'
+down_revision = 'd27f4b8e1c53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Історичні замовлення переносить `flask analytics rebuild`
+    op.create_table('sales_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('color_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue_cents', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'product_id', 'color_id')
+    )
+    op.create_table('sales_day',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('items', sa.Integer(), nullable=False),
+    sa.Column('revenue_cents', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+
+def downgrade():
+    op.drop_table('sales_day')
+    op.drop_table('sales_daily')
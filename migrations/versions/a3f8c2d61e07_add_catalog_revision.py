@@ -0,0 +1,38 @@
+"""Add catalog revision counter and product.updated_at
+
+Revision ID: a3f8c2d61e07
+Revises: 7d2a91c4e5b3
+Create Date: 2026-10-18 11:04:27.530911
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f8c2d61e07'
+down_revision = '7d2a91c4e5b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    catalog_revision = op.create_table('catalog_revision',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('revision', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE product SET updated_at = CURRENT_TIMESTAMP")
+    op.bulk_insert(catalog_revision, [{'id': 1, 'revision': 1}])
+    op.execute("UPDATE catalog_revision SET updated_at = CURRENT_TIMESTAMP")
+
+
+def downgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+
+    op.drop_table('catalog_revision')
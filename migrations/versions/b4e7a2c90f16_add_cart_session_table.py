@@ -0,0 +1,34 @@
+"""Add cart_session table for server-side carts
+
+Revision ID: b4e7a2c90f16
+Revises: 8f3d1c6b2a47
+Create Date: 2026-10-20 09:12:44.180356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e7a2c90f16'
+down_revision = '8f3d1c6b2a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cart_session',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('cart_session', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cart_session_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('cart_session', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cart_session_expires_at'))
+
+    op.drop_table('cart_session')
@@ -0,0 +1,44 @@
+"""Add image processing status and job queue
+
+Revision ID: c51e07b9d2a4
+Revises: a3f8c2d61e07
+Create Date: 2026-10-18 13:47:02.664318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c51e07b9d2a4'
+down_revision = 'a3f8c2d61e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('image_job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('image_job', schema=None) as batch_op:
+        batch_op.create_index('ix_image_job_status_id', ['status', 'id'], unique=False)
+
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=16), nullable=True, server_default='ready'))
+
+
+def downgrade():
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.drop_column('status')
+
+    with op.batch_alter_table('image_job', schema=None) as batch_op:
+        batch_op.drop_index('ix_image_job_status_id')
+
+    op.drop_table('image_job')
@@ -0,0 +1,48 @@
+"""Add product_price table with precomputed prices in cents
+
+Revision ID: d27f4b8e1c53
+Revises: b4e7a2c90f16
+Create Date: 2026-10-20 15:37:08.294615
+
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd27f4b8e1c53'
+down_revision = 'b4e7a2c90f16'
+branch_labels = None
+depends_on = None
+
+
+def _cents(price, modifier=0.0):
+    # Те саме правило, що services/pricing.price_cents
+    value = Decimal(str(price or 0)) * 100 * (1 + Decimal(str(modifier or 0)))
+    return int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def upgrade():
+    product_price = op.create_table('product_price',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('color_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('price_cents', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'color_id')
+    )
+
+    # Заповнення з наявних товарів і кольорів
+    bind = op.get_bind()
+    base = dict(bind.execute(sa.text('SELECT id, price FROM product')).all())
+    rows = [{'product_id': pid, 'color_id': 0, 'price_cents': _cents(price)} for pid, price in base.items()]
+    rows += [{'product_id': product_id, 'color_id': color_id, 'price_cents': _cents(base[product_id], modifier)}
+             for color_id, product_id, modifier in bind.execute(
+                 sa.text('SELECT id, product_id, price_modifier FROM color'))
+             if product_id in base]
+    if rows:
+        op.bulk_insert(product_price, rows)
+
+
+def downgrade():
+    op.drop_table('product_price')
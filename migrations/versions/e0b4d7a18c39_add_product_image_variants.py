@@ -0,0 +1,26 @@
+"""Add responsive image variants
+
+Revision ID: e0b4d7a18c39
+Revises: c51e07b9d2a4
+Create Date: 2026-10-18 15:21:48.092517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e0b4d7a18c39'
+down_revision = 'c51e07b9d2a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.drop_column('variants')
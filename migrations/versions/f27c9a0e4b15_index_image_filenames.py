@@ -0,0 +1,32 @@
+"""Index image filenames for upload reference counting
+
+Revision ID: f27c9a0e4b15
+Revises: e0b4d7a18c39
+Create Date: 2026-10-18 17:02:11.847366
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f27c9a0e4b15'
+down_revision = 'e0b4d7a18c39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_image_filename'), ['filename'], unique=False)
+
+    with op.batch_alter_table('composition', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_composition_image'), ['image'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('composition', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_composition_image'))
+
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_image_filename'))
@@ -4,6 +4,14 @@ from flask_login import UserMixin
 from extensions import db
 
 class Product(db.Model):
+    # Складені індекси під фільтри й keyset-пагінацію каталогу
+    __table_args__ = (
+        db.Index("ix_product_active_id", "is_active", "id"),
+        db.Index("ix_product_active_category", "is_active", "category", "id"),
+        db.Index("ix_product_active_wax_type", "is_active", "wax_type", "id"),
+        db.Index("ix_product_active_price", "is_active", "price", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     sku = db.Column(db.String(64), unique=True, nullable=False)
     name = db.Column(db.String(120), nullable=False)
@@ -16,6 +24,8 @@ class Product(db.Model):
     weight = db.Column(db.Integer)
     price = db.Column(db.Integer, default=0)
     is_active = db.Column(db.Boolean, default=True)
+    # Змінюється разом із товаром, його кольорами та фото (services/revision.py)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     colors = db.relationship("Color", backref="product", cascade="all, delete-orphan")
     images = db.relationship("ProductImage", backref="product",
                              order_by="ProductImage.sort_order",
@@ -23,7 +33,7 @@ class Product(db.Model):
 
 class Color(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    product_id = db.Column(db.Integer, db.ForeignKey("product.id"), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey("product.id"), nullable=False, index=True)
     color_name = db.Column(db.String(64), nullable=False)
     color_hex = db.Column(db.String(7), nullable=False)  # "#FFFFFF"
     is_default = db.Column(db.Boolean, default=False)
@@ -38,15 +48,58 @@ class Color(db.Model):
             "price_modifier": self.price_modifier,
         }
 
-class ProductImage(db.Model):
+class ProductPrice(db.Model):
+    # Ціна в копійках для пари (товар, колір); color_id=0 — товар без кольору.
+    # Оновлюється при flush змін Product.price / Color.price_modifier (services/pricing.py)
+    __tablename__ = "product_price"
+
+    product_id = db.Column(db.Integer, db.ForeignKey("product.id", ondelete="CASCADE"), primary_key=True)
+    color_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    price_cents = db.Column(db.Integer, nullable=False)
+
+class ImageFilesMixin:
+    # Вибір файлу для показу; спільне для ProductImage і знімка каталогу (services/snapshot.py)
+    __slots__ = ()
+
+    @property
+    def thumb_filename(self):
+        # Поки прев’ю не згенероване — показуємо оригінал
+        if self.status == "ready" and self.preview_filename:
+            return self.preview_filename
+        return self.filename
+
+    def ready_variants(self):
+        return (self.variants or {}) if self.status == "ready" else {}
+
+    def fallback_filename(self, max_width=None):
+        # Найбільший JPEG не ширший за max_width; без похідних — оригінал
+        jpegs = self.ready_variants().get("jpeg") or []
+        fitting = [name for width, name in jpegs if max_width is None or width <= max_width]
+        if fitting:
+            return fitting[-1]
+        return jpegs[0][1] if jpegs else self.filename
+
+class ProductImage(ImageFilesMixin, db.Model):
+    # Фото товару в порядку показу: product.images і вибір обкладинки
+    __table_args__ = (db.Index("ix_product_image_product_sort", "product_id", "sort_order", "id"),)
+
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey("product.id"), nullable=False)
-    filename = db.Column(db.String(255), nullable=False)         # оригінал
+    filename = db.Column(db.String(255), nullable=False, index=True)  # оригінал (sha256 вмісту)
     preview_filename = db.Column(db.String(255))                  # прев’ю 200x200
     alt_text = db.Column(db.String(120))
     sort_order = db.Column(db.Integer, default=0)
+    status = db.Column(db.String(16), default="ready")           # pending | ready | failed
+    variants = db.Column(db.JSON)                                 # {"webp": [[320, "x_w320.webp"], ...], "jpeg": [...]}
 
 class Order(db.Model):
+    # Адмінка: keyset-пагінація за (created_at, id), окремо з фільтром статусу чи способу зв'язку
+    __table_args__ = (
+        db.Index("ix_order_created_id", "created_at", "id"),
+        db.Index("ix_order_status_created", "status", "created_at", "id"),
+        db.Index("ix_order_contact_created", "contact_method", "created_at", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     customer_name = db.Column(db.String(120))
     phone = db.Column(db.String(32))
@@ -60,20 +113,71 @@ class Order(db.Model):
 
 class OrderItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=False, index=True)
     product_id = db.Column(db.Integer, db.ForeignKey("product.id"), nullable=False)
     color_id = db.Column(db.Integer, db.ForeignKey("color.id"), nullable=True)
     quantity = db.Column(db.Integer, default=1)
     unit_price = db.Column(db.Float, default=0.0)
 
 class Composition(db.Model):
+    # Публічні сторінки: активні композиції, новіші першими
+    __table_args__ = (db.Index("ix_composition_active_created", "is_active", "created_at"),)
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text)
-    image = db.Column(db.String(255))   # шлях до фото (filename)
+    image = db.Column(db.String(255), index=True)   # шлях до фото (filename)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class ImageJob(db.Model):
+    # Черга обробки фото: оригінал уже на диску, похідні генерує `flask images worker`
+    __table_args__ = (db.Index("ix_image_job_status_id", "status", "id"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="pending")  # pending | running | done | failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CartSession(db.Model):
+    # Кошик на сервері (CART_BACKEND=sql): ключ — короткий випадковий id із cookie сесії
+    __tablename__ = "cart_session"
+
+    id = db.Column(db.String(32), primary_key=True)
+    data = db.Column(db.JSON, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class SalesDaily(db.Model):
+    # Продажі за день (UTC) у розрізі товар × колір, color_id=0 — без кольору.
+    # Нараховуються в place_order, історію перераховує `flask analytics rebuild`.
+    # Без FK: статистика лишається після видалення товару
+    __tablename__ = "sales_daily"
+
+    day = db.Column(db.Date, primary_key=True)
+    product_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    color_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue_cents = db.Column(db.Integer, nullable=False, default=0)
+
+class SalesDay(db.Model):
+    # Підсумок дня: кількість замовлень не виводиться з sales_daily (замовлення має кілька рядків)
+    __tablename__ = "sales_day"
+
+    day = db.Column(db.Date, primary_key=True)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    items = db.Column(db.Integer, nullable=False, default=0)
+    revenue_cents = db.Column(db.Integer, nullable=False, default=0)
+
+class CatalogRevision(db.Model):
+    # Один рядок (id=1): лічильник змін товарів, кольорів, фото і композицій
+    id = db.Column(db.Integer, primary_key=True)
+    revision = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -0,0 +1,165 @@
+# services/analytics.py
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+from models import Order, OrderItem, Product, Color, SalesDaily, SalesDay
+from services.pricing import NO_COLOR, cents_to_price, price_cents
+
+PERIODS = (7, 30, 90)
+TOP_LIMIT = 10
+# Діалекти з INSERT ... ON CONFLICT DO UPDATE, на якому тримається record_order
+UPSERT_DIALECTS = {"sqlite": sqlite, "postgresql": postgresql}
+
+
+def init_app(app):
+    # record_order викликається з place_order: непідтримувана БД має зупинити запуск,
+    # а не кожне оформлення замовлення
+    with app.app_context():
+        name = db.engine.dialect.name
+    if name not in UPSERT_DIALECTS:
+        raise RuntimeError(f"Зведення продажів (services/analytics.py) не підтримують БД {name!r}: "
+                           f"потрібна одна з {', '.join(UPSERT_DIALECTS)}")
+
+
+def _upsert(model, keys, rows):
+    # INSERT ... ON CONFLICT DO UPDATE SET лічильник = лічильник + новий: один запит на пакет рядків
+    stmt = UPSERT_DIALECTS[db.session.get_bind().dialect.name].insert(model)
+    counters = [column for column in rows[0] if column not in keys]
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={column: model.__table__.c[column] + stmt.excluded[column] for column in counters},
+    ), rows)
+
+
+def record_order(day, lines):
+    # Викликається з place_order у транзакції замовлення: два запити незалежно від кількості рядків
+    totals = defaultdict(lambda: [0, 0])
+    for line in lines:
+        entry = totals[(line["product_id"], line["color_id"] or NO_COLOR)]
+        entry[0] += line["quantity"]
+        entry[1] += line["unit_cents"] * line["quantity"]
+    _upsert(SalesDaily, ["day", "product_id", "color_id"], [
+        {"day": day, "product_id": product_id, "color_id": color_id, "orders": 1,
+         "quantity": quantity, "revenue_cents": revenue}
+        for (product_id, color_id), (quantity, revenue) in totals.items()
+    ])
+    _upsert(SalesDay, ["day"], [{"day": day, "orders": 1, "items": sum(q for q, _ in totals.values()),
+                                 "revenue_cents": sum(r for _, r in totals.values())}])
+
+
+def _accumulate(rows, per_line, per_day, last_id):
+    # rows: (order_id, created_at, product_id, color_id, quantity, unit_price), впорядковані за order_id
+    current = None
+    for order_id, created_at, product_id, color_id, quantity, unit_price in rows:
+        if created_at is None:
+            continue
+        day = created_at.date()
+        quantity = quantity or 0
+        revenue = price_cents(unit_price) * quantity
+        line = per_line[(day, product_id, color_id or NO_COLOR)]
+        line[1] += quantity
+        line[2] += revenue
+        if (order_id, product_id, color_id) != current:
+            line[0] += 1
+            current = (order_id, product_id, color_id)
+        totals = per_day[day]
+        if order_id != totals[3]:
+            totals[0] += 1
+            totals[3] = order_id
+        totals[1] += quantity
+        totals[2] += revenue
+        last_id = max(last_id, order_id)
+    return last_id
+
+
+def _order_rows(since, after_id=0, batch=2000):
+    stmt = (select(Order.id, Order.created_at, OrderItem.product_id, OrderItem.color_id,
+                   OrderItem.quantity, OrderItem.unit_price)
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .where(Order.id > after_id)
+            .order_by(Order.id, OrderItem.product_id, OrderItem.color_id))
+    if since:
+        stmt = stmt.where(Order.created_at >= datetime.combine(since, time.min))
+    return db.session.execute(stmt.execution_options(yield_per=batch))
+
+
+def rebuild(since=None):
+    # Перерахунок з order/order_item (історія або дні від since). Читання — до запису; замовлення,
+    # що встигли з'явитись за цей час, дочитуються вже в транзакції запису, тож нічого не губиться
+    per_line = defaultdict(lambda: [0, 0, 0])   # orders, quantity, revenue_cents
+    per_day = defaultdict(lambda: [0, 0, 0, None])  # orders, items, revenue_cents, останній order_id
+    last_id = _accumulate(_order_rows(since), per_line, per_day, 0)
+    db.session.rollback()
+    try:
+        for model in (SalesDaily, SalesDay):
+            stmt = delete(model)
+            if since:
+                stmt = stmt.where(model.day >= since)
+            db.session.execute(stmt)
+        _accumulate(_order_rows(since, after_id=last_id), per_line, per_day, last_id)
+        rows = [{"day": day, "product_id": product_id, "color_id": color_id, "orders": orders,
+                 "quantity": quantity, "revenue_cents": revenue}
+                for (day, product_id, color_id), (orders, quantity, revenue) in per_line.items()]
+        for start in range(0, len(rows), 5000):
+            db.session.execute(insert(SalesDaily), rows[start:start + 5000])
+        if per_day:
+            db.session.execute(insert(SalesDay), [
+                {"day": day, "orders": orders, "items": items, "revenue_cents": revenue}
+                for day, (orders, items, revenue, _) in per_day.items()
+            ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return {"days": len(per_day), "rows": len(per_line), "orders": sum(v[0] for v in per_day.values())}
+
+
+def dashboard(days=30, today=None):
+    # Лише rollup-таблиці: обсяг роботи залежить від періоду і каталогу, а не від кількості замовлень
+    today = today or datetime.utcnow().date()
+    since = today - timedelta(days=days - 1)
+    by_day = {row.day: row for row in db.session.execute(
+        select(SalesDay.day, SalesDay.orders, SalesDay.items, SalesDay.revenue_cents)
+        .where(SalesDay.day >= since).order_by(SalesDay.day))}
+    series = [{"day": day, "orders": row.orders if row else 0, "units": row.items if row else 0,
+               "revenue": cents_to_price(row.revenue_cents if row else 0)}
+              for day in (since + timedelta(days=n) for n in range(days)) for row in [by_day.get(day)]]
+    orders = sum(point["orders"] for point in series)
+    revenue_cents = sum(row.revenue_cents for row in by_day.values())
+
+    revenue = func.sum(SalesDaily.revenue_cents).label("revenue_cents")
+    quantity = func.sum(SalesDaily.quantity).label("quantity")
+    top_products = db.session.execute(
+        select(SalesDaily.product_id, Product.name, quantity, revenue)
+        .outerjoin(Product, Product.id == SalesDaily.product_id)
+        .where(SalesDaily.day >= since)
+        .group_by(SalesDaily.product_id, Product.name)
+        .order_by(revenue.desc()).limit(TOP_LIMIT)
+    ).all()
+    top_colors = db.session.execute(
+        select(Color.color_name, Color.color_hex, quantity, revenue)
+        .join(Color, Color.id == SalesDaily.color_id)
+        .where(SalesDaily.day >= since)
+        .group_by(Color.color_name, Color.color_hex)
+        .order_by(quantity.desc()).limit(TOP_LIMIT)
+    ).all()
+    sold = select(SalesDaily.product_id).where(SalesDaily.day >= since).distinct().scalar_subquery()
+    unsold = db.session.execute(
+        select(func.count()).select_from(Product)
+        .where(Product.is_active == True, Product.id.not_in(sold))  # noqa: E712
+    ).scalar()
+    peak = max((point["revenue"] for point in series), default=0) or 1
+    return {
+        "days": days, "since": since, "today": today,
+        "orders": orders, "units": sum(point["units"] for point in series),
+        "revenue": cents_to_price(revenue_cents),
+        "average": cents_to_price(revenue_cents // orders) if orders else 0,
+        "series": [dict(point, share=point["revenue"] / peak) for point in series],
+        "top_products": [{"product_id": row.product_id, "name": row.name, "quantity": row.quantity,
+                          "revenue": cents_to_price(row.revenue_cents)} for row in top_products],
+        "top_colors": [{"name": row.color_name, "hex": row.color_hex, "quantity": row.quantity,
+                        "revenue": cents_to_price(row.revenue_cents)} for row in top_colors],
+        "unsold": unsold,
+    }
@@ -1,47 +1,144 @@
 # services/cart.py
-from flask import session
+from extensions import cart_store, db
+from models import Product, Color
+from services.catalog import load_covers
+from services.pricing import cents_to_price, price_column
+from services.snapshot import current_snapshot
 
-class CartService:
-    KEY = "cart"
 
+def line_id(product_id, color_id):
+    # Стабільний id рядка кошика: товар + колір (0 — без кольору)
+    return f"{int(product_id)}-{int(color_id or 0)}"
+
+
+def cart_lines(cart):
+    # Рядки кошика в порядку додавання: [(line_id, item)].
+    # Старий формат (список) теж приймаємо — кошики з cookie та бенчмарки
+    if isinstance(cart, dict):
+        return sorted(cart.items(), key=lambda kv: kv[1].get("seq", 0))
+    return [(line_id(it["product_id"], it.get("color_id")), it) for it in cart]
+
+
+class CartService:
+    # Кошик — словник {line_id: {product_id, color_id, quantity, seq}}:
+    # додавання, зміна й видалення — за ключем, без перебору і без індексів списку.
+    # Сховище кошика (cookie / sql / filesystem) — services/cart_store.py, CART_BACKEND у конфігу
     @classmethod
     def get(cls):
-        return session.get(cls.KEY, [])
+        cart = cart_store.load()
+        if isinstance(cart, list):
+            cart = cls._from_list(cart)
+        return cart
 
     @classmethod
     def set(cls, cart):
-        session[cls.KEY] = cart
+        cart_store.save(cart)
+
+    @staticmethod
+    def _from_list(items):
+        cart = {}
+        for seq, it in enumerate(items):
+            key = line_id(it["product_id"], it.get("color_id"))
+            if key in cart:
+                cart[key]["quantity"] += it["quantity"]
+            else:
+                cart[key] = dict(it, seq=seq)
+        return cart
 
     @classmethod
-    def add(cls, product_id, color_id, quantity, unit_price):
+    def add(cls, product_id, color_id, quantity):
         cart = cls.get()
-        for item in cart:
-            if item["product_id"] == product_id and item.get("color_id") == color_id:
-                item["quantity"] += quantity
-                break
+        key = line_id(product_id, color_id)
+        item = cart.get(key)
+        if item:
+            item["quantity"] += quantity
         else:
-            cart.append({
+            cart[key] = {
                 "product_id": product_id,
                 "color_id": color_id,
                 "quantity": quantity,
-                "unit_price": unit_price
-            })
+                "seq": max((it.get("seq", 0) for it in cart.values()), default=-1) + 1,
+            }
         cls.set(cart)
+        return key
 
     @classmethod
-    def update_quantity(cls, index, quantity):
-        cart = cls.get()
-        if 0 <= index < len(cart):
-            cart[index]["quantity"] = max(1, int(quantity))
-            cls.set(cart)
+    def update_quantity(cls, key, quantity):
+        return cls.update_many({key: max(1, int(quantity))})
+
+    @classmethod
+    def remove(cls, key):
+        return cls.update_many({key: 0})
 
     @classmethod
-    def remove(cls, index):
+    def update_many(cls, changes):
+        # {line_id: кількість}; 0 — видалити рядок. Невідомі id (рядок уже видалено
+        # в іншій вкладці) пропускаємо. Один запис кошика на всю пачку
         cart = cls.get()
-        if 0 <= index < len(cart):
-            cart.pop(index)
+        changed = False
+        for key, quantity in changes.items():
+            if key not in cart:
+                continue
+            quantity = int(quantity)
+            if quantity < 1:
+                del cart[key]
+            elif cart[key]["quantity"] != quantity:
+                cart[key]["quantity"] = quantity
+            else:
+                continue
+            changed = True
+        if changed:
             cls.set(cart)
+        return cart
 
     @classmethod
     def clear(cls):
-        cls.set([])
\ No newline at end of file
+        cart_store.clear()
+
+
+def hydrate_cart(cart=None, with_covers=True):
+    # Товари, кольори, ціни й обкладинки для всіх рядків кошика: зі знімка каталогу або
+    # до трьох запитів IN (...) на весь кошик. У самому кошику ціна не зберігається
+    lines = cart_lines(CartService.get() if cart is None else cart)
+    product_ids = {it["product_id"] for _, it in lines}
+    color_ids = {it["color_id"] for _, it in lines if it.get("color_id")}
+    snapshot = current_snapshot()
+    if snapshot:
+        # Знімок каталогу: товари, кольори, ціни й обкладинки без запитів
+        products = {pid: (snapshot.products[pid], snapshot.products[pid].price_cents)
+                    for pid in product_ids if pid in snapshot.products}
+        colors = {cid: (snapshot.colors[cid], snapshot.colors[cid].price_cents)
+                  for cid in color_ids if cid in snapshot.colors}
+        covers = {pid: product.cover for pid, (product, _) in products.items()} if with_covers else {}
+    else:
+        products = {p.id: (p, cents) for p, cents in db.session.query(Product, price_column(Product.id))
+                    .filter(Product.id.in_(product_ids))} if product_ids else {}
+        colors = {c.id: (c, cents) for c, cents in db.session.query(Color, price_column(Color.product_id, Color.id))
+                  .filter(Color.id.in_(color_ids))} if color_ids else {}
+        covers = load_covers(products.keys()) if with_covers else {}
+
+    items = []
+    total_cents = 0
+    for key, it in lines:
+        product, cents = products.get(it["product_id"], (None, None))
+        if not product:
+            continue
+        color, color_cents = colors.get(it.get("color_id"), (None, None))
+        if color and color.product_id == product.id:
+            cents = color_cents if color_cents is not None else cents
+        else:
+            color = None
+        cents = cents or 0
+        subtotal_cents = cents * it["quantity"]
+        total_cents += subtotal_cents
+        items.append({
+            "line_id": key,
+            "product": product,
+            "color": color,
+            "quantity": it["quantity"],
+            "unit_cents": cents,
+            "unit_price": cents_to_price(cents),
+            "subtotal": cents_to_price(subtotal_cents),
+            "cover": covers.get(product.id)
+        })
+    return items, cents_to_price(total_cents)
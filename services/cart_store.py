@@ -0,0 +1,167 @@
+# services/cart_store.py
+import json, os, secrets, tempfile, time
+from datetime import datetime, timedelta
+from flask import g, session
+
+SESSION_KEY = "cart"        # cookie-режим: увесь кошик у підписаній cookie
+SESSION_ID_KEY = "cart_id"  # серверні режими: у cookie лише короткий id
+
+
+class SqlBackend:
+    # Таблиця cart_session: пошук за первинним ключем, прострочені рядки видаляє `flask cart purge`
+    def load(self, cart_id):
+        from extensions import db
+        from models import CartSession
+
+        row = db.session.execute(
+            db.select(CartSession.data).where(CartSession.id == cart_id, CartSession.expires_at > datetime.utcnow())
+        ).first()
+        return row.data if row else None
+
+    def save(self, cart_id, data, ttl):
+        from extensions import db
+        from models import CartSession
+
+        table = CartSession.__table__
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+        # Окреме з'єднання: запис кошика не залежить від стану ORM-сесії запиту
+        with db.engine.begin() as conn:
+            result = conn.execute(
+                table.update().where(table.c.id == cart_id).values(data=data, expires_at=expires_at)
+            )
+            if result.rowcount == 0:
+                conn.execute(table.insert().values(id=cart_id, data=data, expires_at=expires_at))
+
+    def delete(self, cart_id):
+        from extensions import db
+        from models import CartSession
+
+        with db.engine.begin() as conn:
+            conn.execute(CartSession.__table__.delete().where(CartSession.id == cart_id))
+
+    def purge(self):
+        from extensions import db
+        from models import CartSession
+
+        with db.engine.begin() as conn:
+            return conn.execute(
+                CartSession.__table__.delete().where(CartSession.expires_at <= datetime.utcnow())
+            ).rowcount
+
+
+class FileSystemBackend:
+    # JSON-файл на кошик; час завершення — у mtime, як у кеші сторінок
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, cart_id):
+        return os.path.join(self.directory, f"{cart_id}.json")
+
+    def load(self, cart_id):
+        path = self._path(cart_id)
+        try:
+            if os.stat(path).st_mtime < time.time():
+                return None
+            with open(path, encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, cart_id, data, ttl):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False)
+            expires = time.time() + ttl
+            os.utime(tmp_path, (expires, expires))
+            os.replace(tmp_path, self._path(cart_id))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, cart_id):
+        try:
+            os.remove(self._path(cart_id))
+        except OSError:
+            pass
+
+    def purge(self):
+        removed = 0
+        now = time.time()
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.name.endswith(".json") and entry.stat().st_mtime < now:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+class CartStore:
+    # Де живе кошик: cookie (як раніше), sql або filesystem.
+    # Кошик читається раз за запит (кеш у g), записується при кожній зміні
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 30 * 24 * 3600
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        kind = app.config.get("CART_BACKEND", "cookie")
+        self.ttl = app.config.get("CART_TTL", self.ttl)
+        if kind == "cookie":
+            self.backend = None
+        elif kind == "sql":
+            self.backend = SqlBackend()
+        elif kind == "filesystem":
+            directory = app.config.get("CART_DIR") or os.path.join(app.instance_path, "carts")
+            self.backend = FileSystemBackend(directory)
+        else:
+            raise ValueError(f"Невідомий CART_BACKEND: {kind}")
+        app.extensions["cart_store"] = self
+
+    def load(self):
+        if "cart" in g:
+            return g.cart
+        if self.backend is None:
+            data = session.get(SESSION_KEY)
+        else:
+            cart_id = session.get(SESSION_ID_KEY)
+            data = self.backend.load(cart_id) if cart_id else None
+            if data is None and session.get(SESSION_KEY):
+                # Кошик, покладений у cookie до перемикання режиму, переносимо на сервер
+                data = session.pop(SESSION_KEY)
+                self.save(data)
+        g.cart = data if data is not None else {}
+        return g.cart
+
+    def save(self, cart):
+        g.cart = cart
+        if self.backend is None:
+            session[SESSION_KEY] = cart
+            return
+        if not cart:
+            return self.clear()
+        cart_id = session.get(SESSION_ID_KEY)
+        if not cart_id:
+            cart_id = session[SESSION_ID_KEY] = secrets.token_urlsafe(12)
+        self.backend.save(cart_id, cart, self.ttl)
+
+    def clear(self):
+        g.cart = {}
+        if self.backend is None:
+            session.pop(SESSION_KEY, None)
+            return
+        cart_id = session.pop(SESSION_ID_KEY, None)
+        if cart_id:
+            self.backend.delete(cart_id)
+
+    def purge(self):
+        return self.backend.purge() if self.backend is not None else 0
@@ -0,0 +1,235 @@
+# services/catalog.py
+import base64, json
+from flask import current_app
+from sqlalchemy import and_, case, func, or_
+from extensions import db
+from models import Product, Color, ProductImage, Composition
+from services.pricing import cents_to_price, load_price_ranges, price_column
+
+
+def _snapshot():
+    # Знімок каталогу в пам'яті (services/snapshot.py) або None — тоді читаємо з БД
+    from services.snapshot import current_snapshot
+    return current_snapshot()
+
+
+def load_covers(product_ids):
+    # Обкладинка товару — перше фото за sort_order; одним запитом для всіх товарів
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+    ranked = (
+        db.session.query(
+            ProductImage.id.label("image_id"),
+            func.row_number().over(
+                partition_by=ProductImage.product_id,
+                order_by=(ProductImage.sort_order, ProductImage.id),
+            ).label("position"),
+        )
+        .filter(ProductImage.product_id.in_(product_ids))
+        .subquery()
+    )
+    covers = (
+        ProductImage.query
+        .join(ranked, ranked.c.image_id == ProductImage.id)
+        .filter(ranked.c.position == 1)
+        .all()
+    )
+    return {img.product_id: img for img in covers}
+
+
+def load_catalog_cards(query):
+    # Картки каталогу: товари, обкладинки і діапазон цін — фіксовано три запити
+    return build_cards(query.all())
+
+
+def load_cards(product_ids):
+    # Картки товарів у порядку product_ids (результати пошуку)
+    snapshot = _snapshot()
+    if snapshot:
+        return [snapshot.cards[pid] for pid in product_ids if pid in snapshot.cards]
+    products = {p.id: p for p in Product.query.filter(Product.id.in_(product_ids))} if product_ids else {}
+    return build_cards([products[pid] for pid in product_ids if pid in products])
+
+
+def load_product_detail(product_id):
+    # (товар, кольори з ціною, базова ціна) або None; ціни — з product_price
+    snapshot = _snapshot()
+    if snapshot:
+        product = snapshot.products.get(product_id)
+        return (product, list(product.colors), cents_to_price(product.price_cents)) if product else None
+    row = (db.session.query(Product, price_column(Product.id))
+           .filter(Product.id == product_id).first())
+    if row is None:
+        return None
+    product, cents = row
+    colors = [dict(c.to_dict(), price=cents_to_price(color_cents))
+              for c, color_cents in db.session.query(Color, price_column(Color.product_id, Color.id))
+              .filter(Color.product_id == product.id).order_by(Color.id)]
+    return product, colors, cents_to_price(cents)
+
+
+def load_compositions():
+    # Активні композиції, новіші першими
+    snapshot = _snapshot()
+    if snapshot:
+        return snapshot.compositions
+    return Composition.query.filter_by(is_active=True).order_by(Composition.created_at.desc()).all()
+
+
+def build_cards(products):
+    # Обкладинки й ціни (з product_price) для вже завантажених товарів (каталог, пошук) — два запити
+    ids = [p.id for p in products]
+    covers = load_covers(ids)
+    prices = load_price_ranges(ids)
+    cards = []
+    for product in products:
+        price_from, price_to = prices.get(product.id, (0, 0))
+        cards.append({
+            "product": product,
+            "cover": covers.get(product.id),
+            "price_from": cents_to_price(price_from),
+            "price_to": cents_to_price(price_to),
+        })
+    return cards
+
+
+# Сортування каталогу: ключ -> стовпці ORDER BY (останній завжди id для стабільності)
+SORTS = {
+    "new": (Product.id.desc(),),
+    "price_asc": (Product.price.asc(), Product.id.asc()),
+    "price_desc": (Product.price.desc(), Product.id.desc()),
+}
+
+
+def price_bands():
+    # Цінові діапазони з конфігурації: [(ключ, від, до), ...], "до" може бути None
+    bands = []
+    for low, high in current_app.config.get("CATALOG_PRICE_BANDS", []):
+        bands.append((f"{low}-{high if high is not None else ''}", low, high))
+    return bands
+
+
+def parse_filters(args):
+    # Фільтри каталогу з query string; порожні й невідомі значення відкидаємо
+    band_keys = {key for key, _, _ in price_bands()}
+    filters = {
+        "category": args.get("category"),
+        "wax_type": args.get("wax_type"),
+        "price": args.get("price") if args.get("price") in band_keys else None,
+    }
+    return {key: value for key, value in filters.items() if value}
+
+
+def catalog_cache_key(args):
+    # Варіант сторінки каталогу для кешу: лише те, що впливає на вміст, у нормалізованому вигляді
+    filters = parse_filters(args)
+    sort = args.get("sort") if args.get("sort") in SORTS else "new"
+    cursor = decode_cursor(args.get("cursor"))
+    return "&".join(f"{key}={value}" for key, value in sorted(filters.items())) \
+        + f"|{sort}|{encode_cursor(cursor) if cursor else ''}"
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    # Пошкоджений курсор просто повертає першу сторінку
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or not all(isinstance(v, (int, float)) for v in values):
+        return None
+    return values
+
+
+def _apply_filters(query, filters, skip=None):
+    query = query.filter(Product.is_active == True)  # noqa: E712
+    if filters.get("category") and skip != "category":
+        query = query.filter(Product.category == filters["category"])
+    if filters.get("wax_type") and skip != "wax_type":
+        query = query.filter(Product.wax_type == filters["wax_type"])
+    if filters.get("price") and skip != "price":
+        for key, low, high in price_bands():
+            if key == filters["price"]:
+                query = query.filter(Product.price >= low)
+                if high is not None:
+                    query = query.filter(Product.price < high)
+    return query
+
+
+def _after_cursor(query, sort, values):
+    # Keyset-умова: рядки строго після останнього показаного (без OFFSET)
+    if sort == "new" and len(values) == 1:
+        return query.filter(Product.id < values[0])
+    if sort in ("price_asc", "price_desc") and len(values) == 2:
+        price, last_id = values
+        if sort == "price_asc":
+            return query.filter(or_(Product.price > price,
+                                    and_(Product.price == price, Product.id > last_id)))
+        return query.filter(or_(Product.price < price,
+                                and_(Product.price == price, Product.id < last_id)))
+    return query
+
+
+def _cursor_values(product, sort):
+    if sort == "new":
+        return [product.id]
+    return [product.price or 0, product.id]
+
+
+def load_catalog_page(filters, sort="new", cursor=None, page_size=24):
+    # Одна сторінка каталогу за курсором; page_size + 1 рядок показує, чи є наступна
+    sort = sort if sort in SORTS else "new"
+    snapshot = _snapshot()
+    if snapshot:
+        return snapshot.catalog_page(filters, sort, cursor, page_size)
+    query = _apply_filters(Product.query, filters)
+    values = decode_cursor(cursor)
+    if values:
+        query = _after_cursor(query, sort, values)
+    query = query.order_by(*SORTS[sort]).limit(page_size + 1)
+    cards = load_catalog_cards(query)
+    next_cursor = None
+    if len(cards) > page_size:
+        cards = cards[:page_size]
+        next_cursor = encode_cursor(_cursor_values(cards[-1]["product"], sort))
+    return cards, next_cursor
+
+
+def load_facets(filters):
+    # Кількість товарів за кожним значенням фасету з урахуванням інших фільтрів
+    snapshot = _snapshot()
+    if snapshot:
+        return snapshot.facets(filters)
+    facets = {}
+    for field in ("category", "wax_type"):
+        column = getattr(Product, field)
+        rows = (
+            _apply_filters(db.session.query(column, func.count(Product.id)), filters, skip=field)
+            .filter(column.isnot(None), column != "")
+            .group_by(column)
+            .order_by(column)
+        )
+        facets[field] = [(value, count) for value, count in rows]
+
+    bands = price_bands()
+    facets["price"] = []
+    if bands:
+        band = case(
+            *[((Product.price >= low) & (Product.price < high) if high is not None
+               else Product.price >= low, key) for key, low, high in bands]
+        ).label("band")
+        counts = dict(
+            _apply_filters(db.session.query(band, func.count(Product.id)), filters, skip="price")
+            .group_by(band)
+            .all()
+        )
+        facets["price"] = [(key, low, high, counts.get(key, 0)) for key, low, high in bands]
+    return facets
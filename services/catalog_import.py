@@ -0,0 +1,357 @@
+# services/catalog_import.py
+import csv, json, os, re
+from werkzeug.datastructures import FileStorage
+from extensions import db, page_cache, fragment_cache
+from models import Product, Color, ProductImage, ImageJob
+from services.images import allowed_file, store_original, enqueue_derivatives
+
+# Поля товару з файлу; відсутнє поле в існуючого товару не змінюється
+PRODUCT_FIELDS = ("name", "description", "wax_type", "category", "price", "width", "height", "depth", "weight", "is_active")
+INT_FIELDS = ("price", "width", "height", "depth", "weight")
+HEX_RE = re.compile(r"^#[0-9a-fA-F]{6}$")
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "json"}
+TRUE_VALUES = {"1", "true", "yes", "так", "on"}
+FALSE_VALUES = {"0", "false", "no", "ні", "off"}
+
+
+class ImportReport:
+    # Підсумок імпорту; помилки — (рядок/запис у файлі, sku, повідомлення)
+    def __init__(self):
+        self.created = self.updated = self.colors = self.images = self.queued = 0
+        self.errors = []
+
+    def error(self, line, sku, message):
+        self.errors.append((line, sku or "", str(message)))
+
+    def add(self, stats):
+        for key, value in stats.items():
+            setattr(self, key, getattr(self, key) + value)
+
+    @property
+    def imported(self):
+        return self.created + self.updated
+
+
+def detect_format(filename):
+    return FORMATS.get(os.path.splitext(filename or "")[1].lower())
+
+
+# ---------- читання файлу потоком ----------
+
+def iter_records(stream, fmt):
+    # Текстовий потік -> (номер рядка/запису, dict або None, помилка або None)
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line), None
+            except ValueError as e:
+                yield line_no, None, f"Некоректний JSON: {e}"
+    elif fmt == "json":
+        yield from _iter_json_array(stream)
+    else:
+        raise ValueError(f"Невідомий формат імпорту: {fmt}")
+
+
+def _iter_json_array(stream, chunk_size=64 * 1024):
+    # JSON-масив об'єктів без читання всього файлу: raw_decode по буферу, що дочитується частинами
+    decoder = json.JSONDecoder()
+    state = {"buffer": ""}
+
+    def fill():
+        more = stream.read(chunk_size)
+        state["buffer"] += more
+        return bool(more)
+
+    while not state["buffer"].strip() and fill():
+        pass
+    buffer = state["buffer"].lstrip()
+    if not buffer.startswith("["):
+        yield 0, None, "Очікується JSON-масив об'єктів"
+        return
+    state["buffer"], pos, index = buffer, 1, 0
+    while True:
+        buffer = state["buffer"]
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            state["buffer"], pos = "", 0
+            if not fill():
+                yield index + 1, None, "Незавершений JSON-масив"
+                return
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except ValueError as e:
+            # Об'єкт може бути обрізаний межею буфера — дочитуємо; якщо ні — синтаксична помилка,
+            # після якої продовжити розбір неможливо
+            state["buffer"], pos = buffer[pos:], 0
+            if len(state["buffer"]) > 16 * chunk_size or not fill():
+                yield index + 1, None, f"Некоректний JSON: {e}"
+                return
+            continue
+        index += 1
+        yield index, obj, None
+        pos = end
+        if pos > chunk_size:
+            state["buffer"], pos = buffer[pos:], 0
+
+
+# ---------- перевірка й нормалізація запису ----------
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Некоректне значення is_active: {value}")
+
+
+def _parse_colors(value):
+    # Список об'єктів (JSON) або "Назва:#hex:модифікатор;..." (CSV)
+    if value in (None, ""):
+        return []
+    if isinstance(value, str):
+        items = []
+        for part in filter(None, (p.strip() for p in value.split(";"))):
+            name, _, rest = part.partition(":")
+            hex_value, _, modifier = rest.partition(":")
+            items.append({"name": name, "hex": hex_value, "price_modifier": modifier or 0})
+        value = items
+    if not isinstance(value, list):
+        raise ValueError("colors має бути списком")
+    colors = []
+    for item in value:
+        if not isinstance(item, dict):
+            raise ValueError("Колір має бути об'єктом")
+        name = str(item.get("name") or item.get("color_name") or "").strip()
+        hex_value = str(item.get("hex") or item.get("color_hex") or "").strip()
+        if not name:
+            raise ValueError("Колір без назви")
+        if not HEX_RE.match(hex_value):
+            raise ValueError(f"Некоректний колір {name}: {hex_value!r}, потрібно #RRGGBB")
+        try:
+            modifier = float(item.get("price_modifier") or 0)
+        except (TypeError, ValueError):
+            raise ValueError(f"Некоректний price_modifier кольору {name}")
+        colors.append({"color_name": name[:64], "color_hex": hex_value.upper(), "price_modifier": modifier,
+                       "is_default": _parse_bool(item.get("is_default") or False)})
+    if len({c["color_name"].lower() for c in colors}) != len(colors):
+        raise ValueError("Назви кольорів товару повторюються")
+    return colors
+
+
+def _parse_images(value, images_dir):
+    if value in (None, ""):
+        return []
+    names = [n.strip() for n in value.split(";")] if isinstance(value, str) else value
+    if not isinstance(names, list):
+        raise ValueError("images має бути списком")
+    if names and not images_dir:
+        raise ValueError("Фото вказані, але теку з фото не задано")
+    paths = []
+    root = os.path.realpath(images_dir) if images_dir else None
+    for name in filter(None, names):
+        path = os.path.realpath(os.path.join(root, str(name)))
+        # Лише файли всередині теки імпорту
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"Недопустимий шлях до фото: {name}")
+        if not allowed_file(path):
+            raise ValueError(f"Недопустиме розширення фото: {name}")
+        if not os.path.isfile(path):
+            raise ValueError(f"Фото не знайдено: {name}")
+        paths.append(path)
+    return paths
+
+
+def normalize(record, images_dir=None):
+    # Запис із файлу -> {"sku", "fields", "colors", "images"}; ValueError з поясненням для звіту
+    if not isinstance(record, dict):
+        raise ValueError("Запис має бути об'єктом")
+    sku = str(record.get("sku") or "").strip()
+    if not sku:
+        raise ValueError("Порожній sku")
+    if len(sku) > 64:
+        raise ValueError("sku довший за 64 символи")
+    fields = {}
+    for field in PRODUCT_FIELDS:
+        # Порожня клітинка CSV = поле не змінюється
+        if record.get(field) in (None, ""):
+            continue
+        value = record[field]
+        if field in INT_FIELDS:
+            try:
+                value = int(float(value or 0))
+            except (TypeError, ValueError):
+                raise ValueError(f"Некоректне число в полі {field}: {value!r}")
+            if value < 0:
+                raise ValueError(f"Від'ємне значення в полі {field}")
+        elif field == "is_active":
+            value = _parse_bool(value)
+        else:
+            value = str(value).strip()
+        fields[field] = value
+    return {
+        "sku": sku,
+        "fields": fields,
+        "colors": _parse_colors(record.get("colors")),
+        "images": _parse_images(record.get("images"), images_dir),
+    }
+
+
+# ---------- запис у БД пачками ----------
+
+def _store_image(path):
+    with open(path, "rb") as fh:
+        return store_original(FileStorage(fh, filename=os.path.basename(path)))
+
+
+def _apply(rows, dry_run=False):
+    # Upsert пачки: товари за sku, кольори за (товар, назва), фото — в черзі на обробку.
+    # Усі читання — кількома IN-запитами на пачку, не на рядок
+    stats = {"created": 0, "updated": 0, "colors": 0, "images": 0, "queued": 0}
+    skus = [row["sku"] for row in rows]
+    products = {p.sku: p for p in Product.query.filter(Product.sku.in_(skus))}
+    for row in rows:
+        product = products.get(row["sku"])
+        if product is None:
+            if not row["fields"].get("name"):
+                raise ValueError("Новий товар потребує name")
+            product = Product(sku=row["sku"])
+            db.session.add(product)
+            products[row["sku"]] = product
+            stats["created"] += 1
+        else:
+            stats["updated"] += 1
+        for field, value in row["fields"].items():
+            setattr(product, field, value)
+    db.session.flush()
+
+    product_ids = [products[row["sku"]].id for row in rows]
+    colors = {(c.product_id, c.color_name.lower()): c
+              for c in Color.query.filter(Color.product_id.in_(product_ids))}
+    for row in rows:
+        product_id = products[row["sku"]].id
+        for data in row["colors"]:
+            color = colors.get((product_id, data["color_name"].lower()))
+            if color is None:
+                color = Color(product_id=product_id)
+                db.session.add(color)
+                colors[(product_id, data["color_name"].lower())] = color
+            for field, value in data.items():
+                setattr(color, field, value)
+            stats["colors"] += 1
+
+    if dry_run or not any(row["images"] for row in rows):
+        return stats
+
+    stored = {row["sku"]: [_store_image(path) for path in row["images"]] for row in rows if row["images"]}
+    filenames = {name for names in stored.values() for name in names}
+    attached = {(img.product_id, img.filename): img.sort_order or 0
+                for img in ProductImage.query.filter(ProductImage.product_id.in_(product_ids))}
+    # Готові похідні того самого вмісту беремо з наявних записів; черга — лише для нових файлів
+    ready = {img.filename: img for img in ProductImage.query.filter(
+        ProductImage.filename.in_(filenames), ProductImage.status == "ready", ProductImage.variants.isnot(None))}
+    queued = {job.filename for job in ImageJob.query.filter(
+        ImageJob.filename.in_(filenames), ImageJob.status.in_(("pending", "running")))}
+    for sku, names in stored.items():
+        product_id = products[sku].id
+        next_order = max([order for (pid, _), order in attached.items() if pid == product_id], default=-1) + 1
+        for name in names:
+            if (product_id, name) in attached:
+                continue
+            image = ProductImage(product_id=product_id, filename=name, sort_order=next_order, status="pending")
+            if name in ready:
+                image.preview_filename = ready[name].preview_filename
+                image.variants = ready[name].variants
+                image.status = "ready"
+            elif name not in queued:
+                enqueue_derivatives(name)
+                queued.add(name)
+                stats["queued"] += 1
+            db.session.add(image)
+            attached[(product_id, name)] = next_order
+            next_order += 1
+            stats["images"] += 1
+    return stats
+
+
+def _finish(dry_run):
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+
+
+def _import_chunk(chunk, report, dry_run=False):
+    # Пачка — одна транзакція; якщо вона падає, повторюємо рядки поодинці, щоб знайти винний
+    try:
+        stats = _apply([row for _, row in chunk], dry_run)
+        _finish(dry_run)
+        report.add(stats)
+        return
+    except Exception:
+        db.session.rollback()
+    for line, row in chunk:
+        try:
+            stats = _apply([row], dry_run)
+            _finish(dry_run)
+            report.add(stats)
+        except Exception as e:
+            db.session.rollback()
+            report.error(line, row["sku"], e)
+
+
+def import_catalog(stream, fmt, images_dir=None, chunk_size=200, dry_run=False, on_chunk=None):
+    # Потоковий імпорт: файл читається записами, у БД — пачками по chunk_size у власних транзакціях.
+    # Помилка в рядку потрапляє у звіт і не зупиняє імпорт
+    report = ImportReport()
+    chunk, seen = [], {}
+    for line, record, error in iter_records(stream, fmt):
+        if error:
+            report.error(line, (record or {}).get("sku") if isinstance(record, dict) else None, error)
+            continue
+        try:
+            row = normalize(record, images_dir)
+        except ValueError as e:
+            report.error(line, record.get("sku") if isinstance(record, dict) else None, e)
+            continue
+        # Повтор sku в одній пачці — окремою пачкою, щоб не створити товар двічі
+        if row["sku"] in seen:
+            _import_chunk(chunk, report, dry_run)
+            chunk, seen = [], {}
+            if on_chunk:
+                on_chunk(report)
+        chunk.append((line, row))
+        seen[row["sku"]] = line
+        if len(chunk) >= chunk_size:
+            _import_chunk(chunk, report, dry_run)
+            chunk, seen = [], {}
+            if on_chunk:
+                on_chunk(report)
+    if chunk:
+        _import_chunk(chunk, report, dry_run)
+        if on_chunk:
+            on_chunk(report)
+
+    if report.imported and not dry_run:
+        page_cache.invalidate("catalog")
+        page_cache.invalidate("product")
+        fragment_cache.invalidate("product")
+    return report
+
+
+def write_error_report(report, fh):
+    writer = csv.writer(fh)
+    writer.writerow(["line", "sku", "error"])
+    writer.writerows(report.errors)
@@ -0,0 +1,30 @@
+# services/db_tuning.py
+from sqlalchemy import event
+from extensions import db
+
+
+def init_app(app):
+    # PRAGMA застосовуються до кожного нового з'єднання пулу; для PostgreSQL нічого не робимо
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", apply_pragmas)
+
+
+def sqlite_pragmas(names=("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size")):
+    # Фактичні значення на поточному з'єднанні — для перевірки після деплою
+    if db.engine.dialect.name != "sqlite":
+        return {}
+    with db.engine.connect() as conn:
+        return {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in names}
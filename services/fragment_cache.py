@@ -0,0 +1,66 @@
+# services/fragment_cache.py
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from services.page_cache import MemoryBackend, NullBackend
+
+
+class FragmentCacheExtension(Extension):
+    # {% cache "product", product.id, "card", product.updated_at %} ... {% endcache %}
+    # Перші два аргументи — сутність і її id (за ними кеш скидається з адмінки),
+    # решта — назва фрагмента й штамп версії. Новий штамп = новий ключ, тож застарілий
+    # фрагмент не віддається навіть у воркері, до якого інвалідація не дійшла
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(self.call_method("_cached", [nodes.List(args)]), [], [], body).set_lineno(lineno)
+
+    def _cached(self, parts, caller):
+        cache = self.environment.fragment_cache
+        kind, entity_id, *rest = parts
+        namespace = f"{kind}:{entity_id}"
+        key = "|".join(str(part) for part in rest)
+        html = cache.backend.get(namespace, key)
+        if html is None:
+            cache.misses += 1
+            html = str(caller())
+            cache.backend.set(namespace, key, html, cache.ttl)
+        else:
+            cache.hits += 1
+        return Markup(html)
+
+
+class FragmentCache:
+    # Кеш готових шматків шаблонів (картка товару, галерея) у пам'яті процесу
+    def __init__(self, app=None):
+        self.backend = NullBackend()
+        self.ttl = 24 * 3600
+        self.hits = self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        kind = app.config.get("FRAGMENT_CACHE_BACKEND", "memory")
+        self.ttl = app.config.get("FRAGMENT_CACHE_TTL", self.ttl)
+        if kind == "memory":
+            self.backend = MemoryBackend(app.config.get("FRAGMENT_CACHE_MAX_ENTRIES", 4096))
+        elif kind in ("null", "", None):
+            self.backend = NullBackend()
+        else:
+            raise ValueError(f"Невідомий FRAGMENT_CACHE_BACKEND: {kind}")
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.fragment_cache = self
+        app.extensions["fragment_cache"] = self
+
+    def invalidate(self, kind, entity_id=None):
+        # Викликається з адмінки після commit; без id — усі фрагменти цього виду
+        if entity_id is not None:
+            self.backend.delete_namespace(f"{kind}:{entity_id}")
+            return
+        prefix = f"{kind}:"
+        self.backend.delete_where(lambda namespace, key: namespace.startswith(prefix))
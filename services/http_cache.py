@@ -0,0 +1,64 @@
+# services/http_cache.py
+import functools, hashlib
+from datetime import timezone
+from flask import current_app, g, request, make_response
+
+UPLOADS_PREFIX = "img/uploads/"
+ONE_YEAR = 365 * 24 * 3600
+
+
+def conditional(stamp):
+    # stamp(**view_args) -> (версія, datetime останньої зміни).
+    # Якщо клієнт має актуальну копію — 304 без запитів до каталогу і без рендерингу
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**view_args):
+            version, modified = stamp(**view_args)
+            # Версія йде й у ключ кешу сторінок (PageCache.cached): тіло завжди відповідає ETag
+            g.page_version = version
+            if version is None:
+                return view(**view_args)
+            etag = _etag(version)
+            modified = modified.replace(microsecond=0, tzinfo=timezone.utc) if modified else None
+
+            if _not_modified(etag, modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(**view_args))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            if modified:
+                response.last_modified = modified
+            response.cache_control.public = True
+            response.cache_control.max_age = current_app.config.get("HTTP_CACHE_MAX_AGE", 0)
+            response.cache_control.must_revalidate = True
+            return response
+        return wrapper
+    return decorator
+
+
+def _etag(version):
+    # Версія даних + сторінка з параметрами + версія релізу (шаблони)
+    raw = f"{current_app.config.get('CACHE_VERSION', '')}|{request.full_path}|{version}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def _not_modified(etag, modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if modified and request.if_modified_since:
+        return modified <= request.if_modified_since
+    return False
+
+
+def upload_cache_headers(response):
+    # Імена файлів у static/img/uploads унікальні, тож вміст за URL ніколи не змінюється
+    if (request.endpoint == "static"
+            and (request.view_args or {}).get("filename", "").startswith(UPLOADS_PREFIX)
+            and response.status_code in (200, 304)):
+        response.cache_control.public = True
+        response.cache_control.max_age = ONE_YEAR
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
@@ -0,0 +1,72 @@
+# services/image_jobs.py
+from datetime import datetime, timedelta
+from flask import current_app
+from extensions import db, page_cache, fragment_cache
+from models import ImageJob, ProductImage
+from services.images import build_derivatives, derivative_settings, ensure_upload_dir
+from services.revision import bump_catalog_revision
+
+
+def claim_jobs(limit):
+    # Забрати до limit задач; умовний UPDATE не дає двом воркерам взяти одну задачу
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=current_app.config.get("IMAGE_JOB_STALE_SECONDS", 600))
+    ImageJob.query.filter(ImageJob.status == "running", ImageJob.updated_at < stale_before) \
+        .update({"status": "pending"}, synchronize_session=False)
+
+    pending = [job_id for (job_id,) in db.session.query(ImageJob.id)
+               .filter_by(status="pending").order_by(ImageJob.id).limit(limit)]
+    claimed = []
+    for job_id in pending:
+        taken = ImageJob.query.filter_by(id=job_id, status="pending").update(
+            {"status": "running", "attempts": ImageJob.attempts + 1, "updated_at": now},
+            synchronize_session=False,
+        )
+        if taken:
+            claimed.append(job_id)
+    db.session.commit()
+    return ImageJob.query.filter(ImageJob.id.in_(claimed)).all() if claimed else []
+
+
+def run_jobs(jobs, executor=None):
+    # Pillow працює в пулі процесів (або тут же), записи в БД — лише в цьому процесі
+    upload_dir = ensure_upload_dir()
+    settings = derivative_settings()
+    if executor is not None:
+        futures = [(job, executor.submit(build_derivatives, upload_dir, job.filename, **settings))
+                   for job in jobs]
+    else:
+        futures = [(job, None) for job in jobs]
+
+    max_attempts = current_app.config.get("IMAGE_JOB_MAX_ATTEMPTS", 3)
+    done, failed = 0, 0
+    for job, future in futures:
+        try:
+            derivatives = future.result() if future else build_derivatives(upload_dir, job.filename, **settings)
+        except Exception as e:
+            failed += 1
+            job.error = str(e)
+            job.status = "failed" if job.attempts >= max_attempts else "pending"
+            if job.status == "failed":
+                ProductImage.query.filter_by(filename=job.filename) \
+                    .update({"status": "failed"}, synchronize_session=False)
+            current_app.logger.warning("Обробка фото %s не вдалася: %s", job.filename, e)
+            continue
+        done += 1
+        job.status = "done"
+        job.error = None
+        ProductImage.query.filter_by(filename=job.filename) \
+            .update({"preview_filename": derivatives["preview"], "variants": derivatives["variants"],
+                     "status": "ready"}, synchronize_session=False)
+
+    # Масові UPDATE оминають хук ревізії — піднімаємо її вручну і скидаємо кеш сторінок
+    filenames = [job.filename for job in jobs]
+    product_ids = {pid for (pid,) in db.session.query(ProductImage.product_id)
+                   .filter(ProductImage.filename.in_(filenames))}
+    if product_ids:
+        bump_catalog_revision(db.session.connection(), product_ids)
+    db.session.commit()
+    for product_id in product_ids:
+        page_cache.invalidate_product(product_id)
+        fragment_cache.invalidate("product", product_id)
+    return done, failed
@@ -1,36 +1,177 @@
 # services/images.py
-import os, uuid
-from PIL import Image
-from werkzeug.utils import secure_filename
+import glob, hashlib, os, re, tempfile, time
+from PIL import Image, ImageOps, features
 from flask import current_app
+from extensions import db
+from models import ImageJob, ProductImage, Composition
 
 ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp"}
+# Одне розширення на формат: ті самі байти як x.jpg і x.jpeg — один оригінал і один набір похідних
+EXTENSION_ALIASES = {"jpeg": "jpg"}
 
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def ensure_upload_dir():
-    upload_dir = current_app.config.get("UPLOAD_FOLDER", "static/img/uploads")
+    # Відносний UPLOAD_FOLDER рахуємо від кореня застосунку, а не від поточної теки
+    upload_dir = os.path.join(current_app.root_path, current_app.config.get("UPLOAD_FOLDER", "static/img/uploads"))
     os.makedirs(upload_dir, exist_ok=True)
     return upload_dir
 
-def save_image(file_storage):
+def store_original(file_storage):
+    # Ім’я файлу — SHA-256 вмісту: однакові фото зберігаються один раз.
+    # Потік хешуємо й пишемо у тимчасовий файл за один прохід, без читання в пам’ять
     filename = file_storage.filename
     if not allowed_file(filename):
         raise ValueError("Недопустиме розширення файлу")
 
     ext = filename.rsplit(".", 1)[1].lower()
-    unique = f"{uuid.uuid4().hex}.{ext}"
+    ext = EXTENSION_ALIASES.get(ext, ext)
     upload_dir = ensure_upload_dir()
-    original_path = os.path.join(upload_dir, secure_filename(unique))
-    file_storage.save(original_path)
-
-    # Створити прев’ю 200x200
-    preview_name = f"preview_{unique}"
-    preview_path = os.path.join(upload_dir, preview_name)
-    with Image.open(original_path) as img:
-        img = img.convert("RGB") if ext in ("jpg", "jpeg", "webp") else img
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: file_storage.stream.read(64 * 1024), b""):
+                digest.update(chunk)
+                out.write(chunk)
+        unique = f"{digest.hexdigest()[:32]}.{ext}"
+        target = os.path.join(upload_dir, unique)
+        try:
+            # Уже є — лише оновлюємо mtime: release_images не видалить свіжий файл,
+            # поки запис, що на нього посилається, ще не закомічено
+            os.utime(target)
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return unique
+
+# Формат похідного файлу -> (розширення, формат Pillow)
+DERIVATIVE_FORMATS = {"jpeg": ("jpg", "JPEG"), "webp": ("webp", "WEBP"), "avif": ("avif", "AVIF")}
+
+def derivative_settings():
+    # Параметри генерації з конфігу; AVIF вмикається лише якщо Pillow зібраний з libavif
+    formats = [f for f in current_app.config.get("IMAGE_FORMATS", ("webp",))
+               if f in DERIVATIVE_FORMATS and f != "jpeg" and features.check(f)]
+    return {
+        "widths": tuple(current_app.config.get("IMAGE_WIDTHS", (320, 640, 1024))),
+        "formats": tuple(formats) + ("jpeg",),
+        "quality": current_app.config.get("IMAGE_QUALITY", 80),
+    }
+
+def _flatten(img):
+    # JPEG не має прозорості — кладемо на білий фон
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+def build_derivatives(upload_dir, filename, widths=(), formats=("jpeg",), quality=80):
+    # Прев’ю 200x200 + набір ширин у кожному форматі. Без контексту Flask —
+    # можна запускати в окремому процесі. Повертає {"preview": ..., "variants": {формат: [[ширина, файл], ...]}}
+    ext = filename.rsplit(".", 1)[1].lower()
+    stem = filename.rsplit(".", 1)[0]
+    preview_name = f"preview_{filename}"
+    variants = {}
+    with Image.open(os.path.join(upload_dir, filename)) as original:
+        original = ImageOps.exif_transpose(original)
+
+        img = original.convert("RGB") if ext in ("jpg", "jpeg", "webp") else original.copy()
         img.thumbnail((200, 200))
-        img.save(preview_path)
+        img.save(os.path.join(upload_dir, preview_name))
+
+        flat = _flatten(original)
+        # Не збільшуємо: ширини, більші за оригінал, замінюємо на ширину оригіналу
+        targets = sorted({min(w, flat.width) for w in widths})
+        for width in targets:
+            height = max(1, round(flat.height * width / flat.width))
+            resized = flat if width == flat.width else flat.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                suffix, pil_format = DERIVATIVE_FORMATS[fmt]
+                name = f"{stem}_w{width}.{suffix}"
+                resized.save(os.path.join(upload_dir, name), pil_format, quality=quality)
+                variants.setdefault(fmt, []).append([width, name])
+    return {"preview": preview_name, "variants": variants}
+
+def save_image(file_storage, derivatives=True):
+    # Той самий вміст уже оброблений — беремо готові похідні.
+    # Інакше sync: похідні одразу; queue: лише оригінал + задача в черзі (derivatives = None).
+    # derivatives=False — лише оригінал (композиції показують тільки його)
+    unique = store_original(file_storage)
+    if not derivatives:
+        return unique, None
+    existing = ProductImage.query.filter(
+        ProductImage.filename == unique, ProductImage.status == "ready", ProductImage.variants.isnot(None)
+    ).first()
+    if existing:
+        return unique, {"preview": existing.preview_filename, "variants": existing.variants}
+    if current_app.config.get("IMAGE_PROCESSING") == "queue":
+        enqueue_derivatives(unique)
+        return unique, None
+    return unique, build_derivatives(ensure_upload_dir(), unique, **derivative_settings())
+
+def reference_count(filename):
+    return (ProductImage.query.filter_by(filename=filename).count()
+            + Composition.query.filter_by(image=filename).count())
+
+def _recently_stored(upload_dir, filename, grace):
+    try:
+        return os.path.getmtime(os.path.join(upload_dir, filename)) > time.time() - grace
+    except FileNotFoundError:
+        return False
+
+def _stem_referenced(filename):
+    # Похідні (<stem>_w*) іменуються лише за хешем: інший оригінал з тим самим stem
+    # (ті самі байти з іншим розширенням) користується ними ж. Діапазон "<stem>." … "<stem>/" —
+    # пошук за індексом імені файлу, без LIKE
+    stem = filename.rsplit(".", 1)[0]
+    low, high = stem + ".", stem + "/"
+    return any(db.session.query(column).filter(column >= low, column < high).first() is not None
+               for column in (ProductImage.filename, Composition.image))
+
+def release_images(filenames):
+    # Викликати після commit: файли зникають лише разом з останнім посиланням
+    # (ProductImage.filename або Composition.image) на оригінал. Свіжі оригінали (той самий
+    # вміст щойно завантажили вдруге) лишаються — їх прибере `flask images gc`
+    upload_dir = ensure_upload_dir()
+    grace = current_app.config.get("IMAGE_RELEASE_GRACE_SECONDS", 600)
+    removed = 0
+    for filename in set(f for f in filenames if f):
+        if reference_count(filename) == 0 and not _recently_stored(upload_dir, filename, grace):
+            removed += delete_image_files(upload_dir, filename, variants=not _stem_referenced(filename))
+    return removed
+
+def delete_image_files(upload_dir, filename, variants=True):
+    # Оригінал, прев’ю і всі адаптивні похідні (<stem>_w<ширина>.<формат>)
+    stem = filename.rsplit(".", 1)[0]
+    paths = [os.path.join(upload_dir, filename), os.path.join(upload_dir, f"preview_{filename}")]
+    if variants:
+        paths += glob.glob(os.path.join(glob.escape(upload_dir), glob.escape(stem) + "_w*"))
+    removed = 0
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+def enqueue_derivatives(filename):
+    # Задача потрапляє в ту саму транзакцію, що й запис ProductImage/Composition
+    db.session.add(ImageJob(filename=filename))
+
+# <stem>_w<ширина>.<формат> — адаптивні похідні
+VARIANT_RE = re.compile(r"^(?P<stem>.+)_w\d+\.[a-z0-9]+$")
 
-    return unique, preview_name
\ No newline at end of file
+def owner_stem(name):
+    # Оригінал, якому належить файл у теці завантажень
+    if name.startswith("preview_"):
+        name = name[len("preview_"):]
+    match = VARIANT_RE.match(name)
+    if match:
+        return match.group("stem")
+    return name.rsplit(".", 1)[0]
@@ -0,0 +1,199 @@
+# services/instrumentation.py
+import cProfile, hmac, os, threading, time
+from bisect import bisect_left
+from datetime import datetime
+from flask import (g, request, has_request_context, request_started, request_finished,
+                   before_render_template, template_rendered)
+from sqlalchemy import event
+from extensions import db
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+PROFILE_HEADER = "X-Profile"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # останній — +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    # Лічильники й гістограми за маршрутами; у кожного воркера gunicorn свої
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}      # (route, method, status) -> кількість
+        self.durations = {}     # (route, method) -> Histogram секунд
+        self.queries = {}       # (route, method) -> Histogram кількості SQL
+        self.sql_seconds = {}   # (route, method) -> сума
+        self.render_seconds = {}
+        self.slow_queries = 0
+
+    def observe(self, route, method, status, stats, wall):
+        key = (route, method)
+        with self.lock:
+            self.requests[(route, method, status)] = self.requests.get((route, method, status), 0) + 1
+            self.durations.setdefault(key, Histogram(DURATION_BUCKETS)).observe(wall)
+            self.queries.setdefault(key, Histogram(QUERY_BUCKETS)).observe(stats.sql_count)
+            self.sql_seconds[key] = self.sql_seconds.get(key, 0.0) + stats.sql_time
+            self.render_seconds[key] = self.render_seconds.get(key, 0.0) + stats.render_time
+
+    def render(self, extra=()):
+        # Текстовий формат Prometheus 0.0.4
+        lines = []
+        with self.lock:
+            lines += ["# HELP http_requests_total Запити за маршрутом, методом і статусом",
+                      "# TYPE http_requests_total counter"]
+            for (route, method, status), value in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{_labels(route=route, method=method, status=status)} {value}")
+            _histogram(lines, "http_request_duration_seconds", "Повний час обробки запиту", self.durations)
+            _histogram(lines, "http_request_sql_queries", "SQL-запитів на один HTTP-запит", self.queries)
+            for name, help_text, values in (
+                ("http_request_sql_seconds_total", "Сумарний час SQL", self.sql_seconds),
+                ("http_request_render_seconds_total", "Сумарний час рендерингу шаблонів", self.render_seconds),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (route, method), value in sorted(values.items()):
+                    lines.append(f"{name}{_labels(route=route, method=method)} {value:.6f}")
+            lines += ["# HELP sql_slow_queries_total Запити, довші за SLOW_QUERY_MS",
+                      "# TYPE sql_slow_queries_total counter", f"sql_slow_queries_total {self.slow_queries}"]
+        for name, kind, help_text, value in extra:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histogram(lines, name, help_text, histograms):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (route, method), hist in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(route=route, method=method, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(route=route, method=method)} {hist.sum:.6f}")
+        lines.append(f"{name}_count{_labels(route=route, method=method)} {hist.count}")
+
+
+class RequestStats:
+    __slots__ = ("started", "sql_count", "sql_time", "render_time", "render_started", "profiler")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.render_started = []
+        self.profiler = None
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule else "<unmatched>"
+
+
+def init_app(app):
+    # Вмикається INSTRUMENTATION=1: час запиту, рендерингу, кількість і час SQL, повільні запити в лог,
+    # гістограми для /admin/metrics і cProfile за заголовком X-Profile
+    if not app.config.get("INSTRUMENTATION"):
+        return
+    metrics = Metrics()
+    app.extensions["instrumentation"] = metrics
+    slow_query = app.config.get("SLOW_QUERY_MS", 200) / 1000
+    slow_request_queries = app.config.get("SLOW_REQUEST_QUERIES", 50)
+    profile_token = app.config.get("PROFILE_TOKEN")
+    profile_dir = app.config.get("PROFILE_DIR") or os.path.join(app.instance_path, "profiles")
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+        # Час старту — на контексті виконання: він живе один запит, тож помилка SQL
+        # (after_cursor_execute не викликається) нічого не лишає на з'єднанні пулу
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        in_request = has_request_context()
+        stats = g.get("request_stats") if in_request else None
+        if stats is not None:
+            stats.sql_count += 1
+            stats.sql_time += elapsed
+        if elapsed >= slow_query:
+            with metrics.lock:
+                metrics.slow_queries += 1
+            app.logger.warning("Повільний SQL %.1f мс [%s]: %s", elapsed * 1000,
+                               _route() if in_request else "cli", " ".join(statement.split())[:500])
+
+    def _started(sender, **extra):
+        g.request_stats = stats = RequestStats()
+        supplied = request.headers.get(PROFILE_HEADER)
+        if profile_token and supplied and hmac.compare_digest(supplied, profile_token):
+            stats.profiler = cProfile.Profile()
+            stats.profiler.enable()
+
+    def _before_render(sender, template, context, **extra):
+        stats = g.get("request_stats")
+        if stats is not None:
+            stats.render_started.append(time.perf_counter())
+
+    def _rendered(sender, template, context, **extra):
+        stats = g.get("request_stats")
+        if stats is not None and stats.render_started:
+            stats.render_time += time.perf_counter() - stats.render_started.pop()
+
+    def _finished(sender, response, **extra):
+        stats = g.pop("request_stats", None)
+        if stats is None:
+            return
+        wall = time.perf_counter() - stats.started
+        route = _route()
+        metrics.observe(route, request.method, response.status_code, stats, wall)
+        # Server-Timing видно у вкладці Network інструментів розробника
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.sql_time * 1000:.1f};desc="SQL x{stats.sql_count}", '
+            f"tpl;dur={stats.render_time * 1000:.1f}, total;dur={wall * 1000:.1f}"
+        )
+        if stats.sql_count >= slow_request_queries:
+            app.logger.warning("%s %s: %d SQL-запитів за %.1f мс — можливо, N+1",
+                               request.method, route, stats.sql_count, stats.sql_time * 1000)
+        if stats.profiler is not None:
+            stats.profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            name = f"{datetime.utcnow():%Y%m%d-%H%M%S-%f}-{(request.endpoint or 'unmatched').replace('.', '_')}.prof"
+            stats.profiler.dump_stats(os.path.join(profile_dir, name))
+            response.headers["X-Profile-File"] = name
+
+    # weak=False: обробники — замикання всередині init_app
+    request_started.connect(_started, app, weak=False)
+    before_render_template.connect(_before_render, app, weak=False)
+    template_rendered.connect(_rendered, app, weak=False)
+    request_finished.connect(_finished, app, weak=False)
+
+
+def metrics_text(app):
+    metrics = app.extensions.get("instrumentation")
+    if metrics is None:
+        return None
+    extra = []
+    fragments = app.extensions.get("fragment_cache")
+    if fragments is not None:
+        extra += [("fragment_cache_hits_total", "counter", "Фрагменти шаблонів із кешу", fragments.hits),
+                  ("fragment_cache_misses_total", "counter", "Фрагменти, відрендерені заново", fragments.misses)]
+    return metrics.render(extra)
@@ -0,0 +1,96 @@
+# services/order_export.py
+import csv, json
+from sqlalchemy import select
+from extensions import db
+from models import Order, OrderItem, Product, Color
+from services.orders import apply_order_filters
+
+# Один рядок експорту = одна позиція замовлення (замовлення без позицій — один рядок з порожніми полями)
+EXPORT_COLUMNS = (
+    Order.id.label("order_id"),
+    Order.created_at,
+    Order.status,
+    Order.customer_name,
+    Order.phone,
+    Order.contact_method,
+    Order.address,
+    Order.comment,
+    Order.total_amount,
+    OrderItem.id.label("item_id"),
+    Product.sku,
+    Product.name.label("product_name"),
+    Color.color_name,
+    OrderItem.quantity,
+    OrderItem.unit_price,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS] + ["line_total"]
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+# Початок комірки, який Excel/LibreOffice сприймає як формулу
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def iter_export_rows(filters, batch_size=1000):
+    # Серверний курсор + yield_per: рядки читаються пачками під час запису відповіді,
+    # весь результат ніколи не лежить у пам'яті. Порядок — за індексом (created_at, id), без сортування
+    stmt = apply_order_filters(
+        select(*EXPORT_COLUMNS)
+        .select_from(Order)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(Product, Product.id == OrderItem.product_id)
+        .outerjoin(Color, Color.id == OrderItem.color_id),
+        filters,
+    ).order_by(Order.created_at, Order.id, OrderItem.id)
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    try:
+        for row in result:
+            record = row._asdict()
+            record["created_at"] = row.created_at.isoformat(sep=" ", timespec="seconds") if row.created_at else None
+            record["line_total"] = (round(row.quantity * row.unit_price, 2)
+                                    if row.quantity is not None and row.unit_price is not None else None)
+            yield record
+    finally:
+        result.close()
+
+
+def _csv_safe(value):
+    # Текст з форми замовлення (ім'я, телефон, адреса, коментар) не має стати формулою в таблиці
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Line:
+    # csv.writer пише в "файл", який просто повертає рядок
+    def write(self, value):
+        return value
+
+
+def iter_csv(records, bom=False):
+    writer = csv.DictWriter(_Line(), fieldnames=EXPORT_FIELDS)
+    # BOM — щоб Excel відкрив кирилицю без імпорту
+    yield ("\ufeff" if bom else "") + writer.writeheader()
+    for record in records:
+        yield writer.writerow({key: _csv_safe(value) for key, value in record.items()})
+
+
+def iter_jsonl(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _chunked(lines, size=64 * 1024):
+    # Рядки склеюються в шматки ~64 КБ: менше викликів write у WSGI-сервері
+    buffer, length = [], 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def export_orders(filters, fmt="csv", bom=False, batch_size=1000):
+    records = iter_export_rows(filters, batch_size)
+    return _chunked(iter_csv(records, bom=bom) if fmt == "csv" else iter_jsonl(records))
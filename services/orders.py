@@ -0,0 +1,175 @@
+# services/orders.py
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import insert, or_, select
+from extensions import db
+from models import Order, OrderItem, Product, Color
+from services.analytics import record_order
+from services.cart import hydrate_cart
+from services.catalog import encode_cursor, decode_cursor
+from services.pricing import cents_to_price
+
+CONTACT_METHODS = {"phone": "Телефон", "viber": "Viber", "telegram": "Telegram"}
+# Статуси, які пише застосунок: фільтр у списку замовлень без DISTINCT по всій таблиці
+ORDER_STATUSES = {"new": "Нове", "confirmed": "Підтверджене", "shipped": "Відправлене",
+                  "done": "Виконане", "cancelled": "Скасоване"}
+# Рядки, а не ORM-об'єкти: списки в адмінці не наповнюють identity map сесії
+ORDER_COLUMNS = (Order.id, Order.customer_name, Order.phone, Order.contact_method, Order.address,
+                 Order.comment, Order.total_amount, Order.status, Order.created_at)
+EPOCH = datetime(1970, 1, 1)
+
+
+def build_order_lines(cart):
+    # Перевіряємо кошик проти актуальних даних: неактивні/видалені товари відкидаємо, ціна — з product_price
+    items, _ = hydrate_cart(cart, with_covers=False)
+    lines = []
+    for it in items:
+        product, color = it["product"], it["color"]
+        quantity = int(it["quantity"] or 0)
+        if not product.is_active or quantity < 1:
+            continue
+        lines.append({
+            "product_id": product.id,
+            "color_id": color.id if color else None,
+            "quantity": quantity,
+            "unit_cents": it["unit_cents"],
+        })
+    return lines
+
+
+def place_order(form, cart):
+    # Усі читання — до першого INSERT, тож блокування запису SQLite триває лише
+    # два INSERT (замовлення + пакет рядків), два upsert аналітики і COMMIT
+    lines = build_order_lines(cart)
+    if not lines:
+        return None
+
+    order = Order(
+        customer_name=form.get("name"),
+        phone=form.get("phone"),
+        contact_method=form.get("contact_method"),
+        address=form.get("address"),
+        comment=form.get("comment"),
+        status="new",
+        created_at=datetime.utcnow(),
+        total_amount=cents_to_price(sum(l["unit_cents"] * l["quantity"] for l in lines)),
+    )
+    try:
+        db.session.add(order)
+        db.session.flush()
+        db.session.execute(insert(OrderItem), [
+            {"order_id": order.id, "product_id": l["product_id"], "color_id": l["color_id"],
+             "quantity": l["quantity"], "unit_price": cents_to_price(l["unit_cents"])}
+            for l in lines
+        ])
+        record_order(order.created_at.date(), lines)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return order
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def parse_order_filters(args):
+    # Фільтри списку замовлень із query string; некоректні значення відкидаємо
+    filters = {
+        "status": args.get("status"),
+        "contact_method": args.get("contact_method") if args.get("contact_method") in CONTACT_METHODS else None,
+        "date_from": args.get("date_from") if _parse_date(args.get("date_from")) else None,
+        "date_to": args.get("date_to") if _parse_date(args.get("date_to")) else None,
+    }
+    return {key: value for key, value in filters.items() if value}
+
+
+def apply_order_filters(stmt, filters):
+    # Умови фільтрів для будь-якого select, що містить Order (список, експорт)
+    if filters.get("status"):
+        stmt = stmt.where(Order.status == filters["status"])
+    if filters.get("contact_method"):
+        stmt = stmt.where(Order.contact_method == filters["contact_method"])
+    if filters.get("date_from"):
+        stmt = stmt.where(Order.created_at >= datetime.combine(_parse_date(filters["date_from"]), time.min))
+    if filters.get("date_to"):
+        # "до" включно: до початку наступного дня
+        stmt = stmt.where(Order.created_at < datetime.combine(_parse_date(filters["date_to"]) + timedelta(days=1), time.min))
+    return stmt
+
+
+def _order_cursor(order):
+    # created_at як ціле число мікросекунд — без втрати точності, на відміну від float
+    return [(order.created_at - EPOCH) // timedelta(microseconds=1), order.id]
+
+
+def _after_order(stmt, values):
+    # Окреме created_at <= ... дає планувальнику діапазон по індексу, а не перебір від початку
+    created_at, order_id = EPOCH + timedelta(microseconds=values[0]), values[1]
+    return stmt.where(Order.created_at <= created_at,
+                      or_(Order.created_at < created_at, Order.id < order_id))
+
+
+def load_order_items(order_ids):
+    # Позиції для сторінки замовлень одним запитом: {order_id: [рядки з назвою товару й кольору]}
+    order_ids = list(order_ids)
+    if not order_ids:
+        return {}
+    rows = db.session.execute(
+        select(OrderItem.order_id, OrderItem.product_id, OrderItem.quantity, OrderItem.unit_price,
+               Product.name.label("product_name"), Color.color_name)
+        .outerjoin(Product, Product.id == OrderItem.product_id)
+        .outerjoin(Color, Color.id == OrderItem.color_id)
+        .where(OrderItem.order_id.in_(order_ids))
+        .order_by(OrderItem.order_id, OrderItem.id)
+    )
+    items = {}
+    for row in rows:
+        items.setdefault(row.order_id, []).append(row)
+    return items
+
+
+def load_orders_page(filters, cursor=None, page_size=50):
+    # Сторінка за keyset-курсором (новіші першими) + позиції — завжди два запити
+    stmt = apply_order_filters(select(*ORDER_COLUMNS), filters)
+    values = decode_cursor(cursor)
+    if values and len(values) == 2:
+        stmt = _after_order(stmt, values)
+    orders = db.session.execute(
+        stmt.order_by(Order.created_at.desc(), Order.id.desc()).limit(page_size + 1)
+    ).all()
+    next_cursor = None
+    if len(orders) > page_size:
+        orders = orders[:page_size]
+        next_cursor = encode_cursor(_order_cursor(orders[-1]))
+    items = load_order_items(o.id for o in orders)
+    return [(o, items.get(o.id, [])) for o in orders], next_cursor
+
+
+def iter_orders(filters, batch_size=500):
+    # Усі замовлення діапазону пачками за тим самим курсором: пам'ять не росте з кількістю рядків
+    cursor = None
+    while True:
+        rows, cursor = load_orders_page(filters, cursor, batch_size)
+        yield from rows
+        if not cursor:
+            return
+
+
+def order_to_dict(order, items):
+    return {
+        "id": order.id,
+        "created_at": order.created_at.isoformat() if order.created_at else None,
+        "status": order.status,
+        "customer_name": order.customer_name,
+        "phone": order.phone,
+        "contact_method": order.contact_method,
+        "address": order.address,
+        "comment": order.comment,
+        "total_amount": order.total_amount,
+        "items": [{"product_id": it.product_id, "product_name": it.product_name, "color_name": it.color_name,
+                   "quantity": it.quantity, "unit_price": it.unit_price} for it in items],
+    }
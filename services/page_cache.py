@@ -0,0 +1,223 @@
+# services/page_cache.py
+import functools, hashlib, os, tempfile, threading, time
+from collections import OrderedDict
+from flask import g, request, make_response
+
+
+class NullBackend:
+    # Кеш вимкнено: нічого не зберігаємо
+    def get(self, namespace, key):
+        return None
+
+    def set(self, namespace, key, value, ttl):
+        pass
+
+    def delete(self, namespace, key):
+        pass
+
+    def delete_namespace(self, namespace):
+        pass
+
+    def delete_where(self, match):
+        pass
+
+
+class MemoryBackend:
+    # LRU у пам'яті процесу з TTL; для одного воркера або розробки
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.time():
+                del self._entries[(namespace, key)]
+                return None
+            self._entries.move_to_end((namespace, key))
+            return value
+
+    def set(self, namespace, key, value, ttl):
+        with self._lock:
+            self._entries[(namespace, key)] = (time.time() + ttl, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+    def delete_namespace(self, namespace):
+        self.delete_where(lambda entry_namespace, key: entry_namespace == namespace)
+
+    def delete_where(self, match):
+        # match(namespace, key) -> True, якщо запис треба видалити
+        with self._lock:
+            for entry_key in [k for k in self._entries if match(*k)]:
+                del self._entries[entry_key]
+
+
+class FileSystemBackend:
+    # Файли в спільній теці: бачать усі воркери gunicorn; час завершення — у mtime файлу.
+    # Кожні SWEEP_EVERY записів прострочені файли видаляються, а понад max_entries —
+    # ті, що спливають найраніше: тека не росте без меж
+    SWEEP_EVERY = 32
+
+    def __init__(self, directory, max_entries=512):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, namespace, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, namespace, digest)
+
+    def get(self, namespace, key):
+        path = self._path(namespace, key)
+        try:
+            if os.stat(path).st_mtime < time.time():
+                os.remove(path)
+                return None
+            with open(path, "rb") as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+    def set(self, namespace, key, value, ttl):
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Атомарний запис: тимчасовий файл у тій самій теці + os.replace
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(value)
+            expires = time.time() + ttl
+            os.utime(tmp_path, (expires, expires))
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.SWEEP_EVERY == 0
+        if due:
+            self.sweep()
+
+    def sweep(self):
+        now = time.time()
+        entries = []
+        try:
+            namespaces = [entry.path for entry in os.scandir(self.directory) if entry.is_dir()]
+        except OSError:
+            return
+        for namespace in namespaces:
+            try:
+                files = list(os.scandir(namespace))
+            except OSError:
+                continue
+            for entry in files:
+                if entry.name.startswith("tmp"):
+                    continue  # незавершений запис з set()
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+        entries.sort()
+        excess = max(0, len(entries) - self.max_entries)
+        for index, (expires, path) in enumerate(entries):
+            if index >= excess and expires >= now:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def delete(self, namespace, key):
+        try:
+            os.remove(self._path(namespace, key))
+        except OSError:
+            pass
+
+    def delete_namespace(self, namespace):
+        try:
+            entries = list(os.scandir(os.path.join(self.directory, namespace)))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class PageCache:
+    # Кеш повних HTML-відповідей публічних сторінок.
+    # Простір імен — сторінка ("catalog", "product"...), ключ — варіант (id, query string)
+    def __init__(self, app=None):
+        self.backend = NullBackend()
+        self.ttl = 300
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        kind = app.config.get("PAGE_CACHE_BACKEND", "memory")
+        self.ttl = app.config.get("PAGE_CACHE_TTL", 300)
+        if kind == "memory":
+            self.backend = MemoryBackend(app.config.get("PAGE_CACHE_MAX_ENTRIES", 512))
+        elif kind == "filesystem":
+            directory = app.config.get("PAGE_CACHE_DIR") or os.path.join(app.instance_path, "page_cache")
+            self.backend = FileSystemBackend(directory, app.config.get("PAGE_CACHE_MAX_ENTRIES", 512))
+        elif kind in ("null", "", None):
+            self.backend = NullBackend()
+        else:
+            raise ValueError(f"Невідомий PAGE_CACHE_BACKEND: {kind}")
+        app.extensions["page_cache"] = self
+
+    def cached(self, namespace, key=None):
+        # key(**view_args) -> рядок варіанту; без key сторінка має один варіант, query string
+        # ігнорується — інакше кожен невідомий параметр (?utm=...) створював би окремий запис.
+        # Запис зберігається разом із версією даних від @conditional і віддається лише за тієї ж
+        # версії: інший воркер не поверне стару сторінку під новим ETag, навіть якщо інвалідація
+        # до нього не дійшла або рендер почався ще до commit в адмінці
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(**view_args):
+                if request.method not in ("GET", "HEAD"):
+                    return view(**view_args)
+                variant = str(key(**view_args)) if key else ""
+                version = str(g.pop("page_version", None)).encode("utf-8") + b"\n"
+                stored = self.backend.get(namespace, variant)
+                if stored is not None and stored.startswith(version):
+                    response = make_response(stored[len(version):])
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+                response = make_response(view(**view_args))
+                if response.status_code == 200 and not response.direct_passthrough:
+                    self.backend.set(namespace, variant, version + response.get_data(), self.ttl)
+                response.headers["X-Cache"] = "MISS"
+                return response
+            return wrapper
+        return decorator
+
+    def invalidate(self, namespace, key=None):
+        # Викликається з адмінки після commit
+        if key is None:
+            self.backend.delete_namespace(namespace)
+        else:
+            self.backend.delete(namespace, str(key))
+
+    def invalidate_product(self, product_id):
+        # Зміна товару, його кольорів чи фото впливає на сторінку товару й каталог
+        self.invalidate("product", product_id)
+        self.invalidate("catalog")
+
+    def invalidate_compositions(self):
+        self.invalidate("index")
+        self.invalidate("compositions")
+
@@ -0,0 +1,106 @@
+# services/pricing.py
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import case, delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+from extensions import db
+from models import Product, Color, ProductPrice
+
+NO_COLOR = 0  # color_id рядка з базовою ціною товару
+
+
+def init_app(app):
+    # Таблиця product_price перераховується в тому ж flush, що змінив ціну чи модифікатор
+    if not event.contains(Session, "before_flush", _collect_changes):
+        event.listen(Session, "before_flush", _collect_changes)
+        event.listen(Session, "after_flush", _refresh_changed)
+
+
+def price_cents(price, modifier=0.0):
+    # Ціна в копійках: рахується один раз при записі, десятковою арифметикою
+    value = Decimal(str(price or 0)) * 100 * (1 + Decimal(str(modifier or 0)))
+    return int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _changed(obj, *fields):
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def _collect_changes(session, flush_context, instances):
+    product_ids = session.info.setdefault("price_products", set())
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Product):
+            product_ids.add(obj)
+        elif isinstance(obj, Color):
+            product_ids.add(obj.product_id or obj.product)
+    for obj in session.dirty:
+        if isinstance(obj, Product) and _changed(obj, "price"):
+            product_ids.add(obj)
+        elif isinstance(obj, Color) and _changed(obj, "price_modifier", "product_id"):
+            product_ids.add(obj.product_id)
+            product_ids.update(inspect(obj).attrs.product_id.history.deleted)
+    if not product_ids:
+        session.info.pop("price_products")
+
+
+def _refresh_changed(session, flush_context):
+    changed = session.info.pop("price_products", None)
+    if not changed:
+        return
+    # Нові товари отримують id лише під час flush — тому тут, а не в before_flush
+    product_ids = {item.id if isinstance(item, Product) else item for item in changed}
+    refresh_prices(session.connection(), product_ids)
+
+
+def refresh_prices(connection, product_ids=None):
+    # Перерахунок цін товарів (усіх, якщо product_ids=None) з актуальних даних у транзакції
+    table = ProductPrice.__table__
+    products = select(Product.id, Product.price)
+    colors = select(Color.id, Color.product_id, Color.price_modifier)
+    clear = delete(table)
+    if product_ids is not None:
+        product_ids = [pid for pid in product_ids if pid is not None]
+        if not product_ids:
+            return
+        products = products.where(Product.id.in_(product_ids))
+        colors = colors.where(Color.product_id.in_(product_ids))
+        clear = clear.where(table.c.product_id.in_(product_ids))
+
+    base = dict(connection.execute(products).all())
+    rows = [{"product_id": pid, "color_id": NO_COLOR, "price_cents": price_cents(price)}
+            for pid, price in base.items()]
+    rows += [{"product_id": product_id, "color_id": color_id, "price_cents": price_cents(base[product_id], modifier)}
+             for color_id, product_id, modifier in connection.execute(colors) if product_id in base]
+    connection.execute(clear)
+    if rows:
+        connection.execute(insert(table), rows)
+
+
+def cents_to_price(cents):
+    return (cents or 0) / 100
+
+
+def load_price_ranges(product_ids):
+    # {product_id: (від, до)} у копійках — одним запитом за первинним ключем product_price.
+    # Товар із кольорами — діапазон цін кольорів, без кольорів — базова ціна
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+    colored = case((ProductPrice.color_id != NO_COLOR, ProductPrice.price_cents))
+    plain = case((ProductPrice.color_id == NO_COLOR, ProductPrice.price_cents))
+    rows = db.session.execute(
+        select(ProductPrice.product_id, func.min(colored), func.max(colored), func.max(plain))
+        .where(ProductPrice.product_id.in_(product_ids))
+        .group_by(ProductPrice.product_id)
+    )
+    return {product_id: (low, high) if low is not None else (base, base)
+            for product_id, low, high, base in rows}
+
+
+def price_column(product_id, color_id=NO_COLOR):
+    # Ціна з product_price як стовпець того самого SELECT (пошук за первинним ключем)
+    return (
+        select(ProductPrice.price_cents)
+        .where(ProductPrice.product_id == product_id, ProductPrice.color_id == color_id)
+        .scalar_subquery()
+    )
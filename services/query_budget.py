@@ -0,0 +1,85 @@
+# services/query_budget.py
+import functools, threading
+from contextlib import contextmanager
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_local = threading.local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def report(self, limit=None):
+        header = f"{self.count} SQL" + (f" при бюджеті {limit}" if limit is not None else "")
+        return "\n".join([header] + [f"  {i}. {' '.join(s.split())[:300]}"
+                                     for i, s in enumerate(self.statements, 1)])
+
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, "paused", 0):
+        return
+    for counter in getattr(_local, "counters", ()):
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    # Рахує SQL цього потоку (усі рушії) у межах блоку:
+    #   with count_queries() as counter: client.get("/catalog")
+    if not event.contains(Engine, "before_cursor_execute", _record):
+        event.listen(Engine, "before_cursor_execute", _record)
+    counter = QueryCounter()
+    counters = _local.__dict__.setdefault("counters", [])
+    counters.append(counter)
+    try:
+        yield counter
+    finally:
+        counters.remove(counter)
+
+
+@contextmanager
+def uncounted():
+    # Разова робота, що амортизується на багато запитів (перебудова знімка каталогу),
+    # не входить у бюджет того запиту, якому випало її виконати
+    _local.paused = getattr(_local, "paused", 0) + 1
+    try:
+        yield
+    finally:
+        _local.paused -= 1
+
+
+def _enforced():
+    # QUERY_BUDGET=1/0 явно; інакше перевірка працює в debug-режимі (flask run --debug)
+    enabled = current_app.config.get("QUERY_BUDGET")
+    return current_app.debug if enabled is None else enabled
+
+
+def query_budget(limit):
+    # Найбільша кількість SQL на один запит до в'юхи, незалежно від обсягу даних.
+    # Ставиться одразу під @bp.route, щоб рахувалось усе: ETag, кеш сторінок, шаблон.
+    # Перевищення — QueryBudgetExceeded зі списком запитів; benchmarks/query_budget.py
+    # проганяє всі в'юхи з бюджетом на заповненій БД
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _enforced():
+                return view(*args, **kwargs)
+            with count_queries() as counter:
+                response = view(*args, **kwargs)
+            if counter.count > limit:
+                raise QueryBudgetExceeded(f"{view.__module__}.{view.__name__}: {counter.report(limit)}")
+            return response
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
@@ -0,0 +1,77 @@
+# services/revision.py
+from datetime import datetime
+from flask import g, has_app_context, has_request_context
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+from extensions import db
+from models import Product, Color, ProductImage, Composition, CatalogRevision
+
+CATALOG_MODELS = (Product, Color, ProductImage, Composition)
+
+
+def init_app(app):
+    # Будь-який flush зі змінами каталогу піднімає ревізію — і з адмінки, і з CLI
+    if not event.contains(Session, "before_flush", _collect_changes):
+        event.listen(Session, "before_flush", _collect_changes)
+        event.listen(Session, "after_flush", _bump_revision)
+    app.teardown_request(_forget_stamp)
+
+
+def _forget_stamp(exc=None):
+    if has_app_context():
+        g.pop("catalog_stamp", None)
+
+
+def _collect_changes(session, flush_context, instances):
+    touched = [obj for obj in session.new | session.deleted if isinstance(obj, CATALOG_MODELS)]
+    touched += [obj for obj in session.dirty
+                if isinstance(obj, CATALOG_MODELS) and session.is_modified(obj)]
+    if touched:
+        session.info.setdefault("catalog_touched", []).extend(touched)
+
+
+def _bump_revision(session, flush_context):
+    touched = session.info.pop("catalog_touched", None)
+    if not touched:
+        return
+    product_ids = {obj.id if isinstance(obj, Product) else obj.product_id
+                   for obj in touched if not isinstance(obj, Composition)}
+    bump_catalog_revision(session.connection(), product_ids)
+    _forget_stamp()
+
+
+def bump_catalog_revision(connection, product_ids=()):
+    # Для масових UPDATE/DELETE поза ORM викликати вручну в тій самій транзакції
+    now = datetime.utcnow()
+    product_ids = [pid for pid in product_ids if pid is not None]
+    if product_ids:
+        connection.execute(
+            update(Product.__table__).where(Product.__table__.c.id.in_(product_ids)).values(updated_at=now)
+        )
+    table = CatalogRevision.__table__
+    result = connection.execute(
+        update(table).where(table.c.id == 1).values(revision=table.c.revision + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(id=1, revision=1, updated_at=now))
+
+
+def catalog_stamp():
+    # (ревізія, час останньої зміни) — один дешевий запит на HTTP-запит: ETag, знімок каталогу
+    # і фасети беруть його з g (скидається в кінці запиту і після зміни каталогу)
+    if has_request_context() and "catalog_stamp" in g:
+        return g.catalog_stamp
+    row = db.session.execute(
+        select(CatalogRevision.revision, CatalogRevision.updated_at).where(CatalogRevision.id == 1)
+    ).first()
+    stamp = (row.revision, row.updated_at) if row else (0, None)
+    if has_request_context():
+        g.catalog_stamp = stamp
+    return stamp
+
+
+def product_stamp(product_id):
+    updated_at = db.session.execute(
+        select(Product.updated_at).where(Product.id == product_id)
+    ).scalar()
+    return (updated_at.isoformat() if updated_at else None), updated_at
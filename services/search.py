@@ -0,0 +1,147 @@
+# services/search.py
+import re
+from sqlalchemy import or_, text
+from extensions import db
+from models import Product
+from services.catalog import load_cards
+from services.snapshot import current_snapshot
+
+SEARCH_TABLE = "product_search"
+# Ваги bm25 для стовпців: name, description, category, wax_type, colors
+WEIGHTS = (10.0, 1.0, 4.0, 4.0, 3.0)
+MAX_TERMS = 8
+# Автодоповнення ранжує bm25 лише стільки найновіших збігів: повний bm25 по десятках
+# тисяч збігів короткого префікса коштує десятки мс, а вікно — одиниці. Окреме вікно
+# збігів за назвою, щоб сильний збіг на старому товарі не губився за новішими описами
+SUGGEST_WINDOW = 200
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# FTS5-індекс (лише SQLite): rowid = product.id, кольори — назви через пробіл.
+# Синхронізація тригерами, тож індекс оновлюється і з адмінки, і з CLI, і з сирого SQL.
+# Та сама DDL — у міграції 5c8e2a7f9d31; `flask search rebuild` відновлює індекс за нею.
+# prefix='2 3 4' — готові префіксні індекси для автодоповнення
+SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS product_search USING fts5(
+        name, description, category, wax_type, colors,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')""",
+    """CREATE TRIGGER IF NOT EXISTS product_search_ai AFTER INSERT ON product BEGIN
+        INSERT INTO product_search (rowid, name, description, category, wax_type, colors)
+        VALUES (new.id, new.name, new.description, new.category, new.wax_type,
+                (SELECT group_concat(color_name, ' ') FROM color WHERE product_id = new.id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS product_search_au
+    AFTER UPDATE OF name, description, category, wax_type ON product BEGIN
+        UPDATE product_search SET name = new.name, description = new.description,
+            category = new.category, wax_type = new.wax_type
+        WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS product_search_ad AFTER DELETE ON product BEGIN
+        DELETE FROM product_search WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS color_search_ai AFTER INSERT ON color BEGIN
+        UPDATE product_search
+        SET colors = (SELECT group_concat(color_name, ' ') FROM color WHERE product_id = new.product_id)
+        WHERE rowid = new.product_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS color_search_au AFTER UPDATE OF color_name, product_id ON color BEGIN
+        UPDATE product_search
+        SET colors = (SELECT group_concat(color_name, ' ') FROM color WHERE product_id = product_search.rowid)
+        WHERE rowid IN (old.product_id, new.product_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS color_search_ad AFTER DELETE ON color BEGIN
+        UPDATE product_search
+        SET colors = (SELECT group_concat(color_name, ' ') FROM color WHERE product_id = old.product_id)
+        WHERE rowid = old.product_id;
+    END""",
+]
+
+DROP_SCHEMA = [
+    "DROP TRIGGER IF EXISTS color_search_ad",
+    "DROP TRIGGER IF EXISTS color_search_au",
+    "DROP TRIGGER IF EXISTS color_search_ai",
+    "DROP TRIGGER IF EXISTS product_search_ad",
+    "DROP TRIGGER IF EXISTS product_search_au",
+    "DROP TRIGGER IF EXISTS product_search_ai",
+    "DROP TABLE IF EXISTS product_search",
+]
+
+POPULATE = """INSERT INTO product_search (rowid, name, description, category, wax_type, colors)
+    SELECT p.id, p.name, p.description, p.category, p.wax_type,
+           (SELECT group_concat(c.color_name, ' ') FROM color c WHERE c.product_id = p.id)
+    FROM product p"""
+
+
+def fts_enabled():
+    return db.engine.dialect.name == "sqlite"
+
+
+def rebuild_index():
+    # Повне перестворення: після ручних змін схеми або якщо БД створено через create_all
+    with db.engine.begin() as conn:
+        for statement in DROP_SCHEMA + SCHEMA + [POPULATE]:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+        return conn.exec_driver_sql(f"SELECT count(*) FROM {SEARCH_TABLE}").scalar()
+
+
+def match_expression(query):
+    # Текст користувача -> безпечний FTS5-запит: кожне слово в лапках і як префікс, усі слова обов'язкові
+    terms = TOKEN_RE.findall(query.lower())[:MAX_TERMS]
+    return " ".join(f'"{term}"*' for term in terms) or None
+
+
+def _ranked_ids(query, limit, offset=0, window=None):
+    match = match_expression(query)
+    if not match:
+        return []
+    if not fts_enabled():
+        # PostgreSQL без FTS5: простий ILIKE за назвою/описом, без ранжування
+        pattern = f"%{query.strip()}%"
+        rows = (
+            db.session.query(Product.id)
+            .filter(Product.is_active == True,  # noqa: E712
+                    or_(Product.name.ilike(pattern), Product.description.ilike(pattern)))
+            .order_by(Product.name, Product.id)
+            .limit(limit).offset(offset)
+        )
+        return [product_id for product_id, in rows]
+    weights = ", ".join(str(w) for w in WEIGHTS)
+    params = {"match": match, "limit": limit, "offset": offset}
+    if window:
+        # Вікна: FTS5 віддає збіги в порядку rowid без сортування, bm25 рахується лише для них.
+        # Збіги за назвою — окремим вікном; товар з обох вікон береться з кращою оцінкою
+        window_sql = f"""SELECT * FROM (SELECT rowid, bm25({SEARCH_TABLE}, {weights}) AS score
+            FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s ORDER BY rowid DESC LIMIT {int(window)})"""
+        candidates = f"""SELECT rowid, min(score) AS score FROM (
+            {window_sql % ":name_match"} UNION ALL {window_sql % ":match"}) GROUP BY rowid"""
+        params["name_match"] = f"{{name}} : ({match})"
+    else:
+        candidates = f"""SELECT rowid, bm25({SEARCH_TABLE}, {weights}) AS score FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH :match"""
+    rows = db.session.execute(text(f"""
+        SELECT c.rowid FROM ({candidates}) c JOIN product p ON p.id = c.rowid
+        WHERE p.is_active = 1
+        ORDER BY c.score, c.rowid
+        LIMIT :limit OFFSET :offset"""), params)
+    return [product_id for product_id, in rows]
+
+
+def _products_in_order(ids):
+    snapshot = current_snapshot()
+    products = snapshot.products if snapshot else (
+        {p.id: p for p in Product.query.filter(Product.id.in_(ids))} if ids else {})
+    return [products[i] for i in ids if i in products]
+
+
+def search_page(query, page=1, page_size=24):
+    # Сторінка результатів у порядку релевантності; page_size + 1 показує, чи є наступна
+    page = max(page, 1)
+    ids = _ranked_ids(query, page_size + 1, (page - 1) * page_size)
+    cards = load_cards(ids[:page_size])
+    return cards, len(ids) > page_size
+
+
+def suggest(query, limit=8):
+    # Автодоповнення: лише назва, ціна і посилання — без обкладинок
+    products = _products_in_order(_ranked_ids(query, limit, window=SUGGEST_WINDOW))
+    return [{"id": p.id, "name": p.name, "price": p.price} for p in products]
@@ -0,0 +1,237 @@
+# services/snapshot.py
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from flask import current_app, g, has_request_context
+from sqlalchemy import select
+from extensions import db
+from models import Product, Color, ProductImage, Composition, ProductPrice, CatalogRevision, ImageFilesMixin
+from services.catalog import price_bands, decode_cursor, encode_cursor
+from services.pricing import NO_COLOR, cents_to_price
+from services.query_budget import uncounted
+from services.revision import catalog_stamp
+
+
+# ---------- записи знімка: незмінні, зі __slots__ ----------
+
+@dataclass(frozen=True, slots=True)
+class ColorRecord:
+    id: int
+    product_id: int
+    color_name: str
+    color_hex: str
+    is_default: bool
+    price_modifier: float
+    price_cents: int
+
+    @property
+    def price(self):
+        return cents_to_price(self.price_cents)
+
+
+@dataclass(frozen=True, slots=True)
+class ImageRecord(ImageFilesMixin):
+    id: int
+    product_id: int
+    filename: str
+    preview_filename: str
+    alt_text: str
+    sort_order: int
+    status: str
+    variants: dict
+
+
+@dataclass(frozen=True, slots=True)
+class ProductRecord:
+    id: int
+    sku: str
+    name: str
+    description: str
+    wax_type: str
+    category: str
+    width: int
+    height: int
+    depth: int
+    weight: int
+    price: int
+    is_active: bool
+    updated_at: datetime
+    colors: tuple
+    images: tuple
+    price_cents: int
+    price_from: int  # копійки: діапазон цін кольорів або базова ціна
+    price_to: int
+
+    @property
+    def cover(self):
+        return self.images[0] if self.images else None
+
+
+@dataclass(frozen=True, slots=True)
+class CompositionRecord:
+    id: int
+    title: str
+    description: str
+    image: str
+    is_active: bool
+    created_at: datetime
+
+
+def _record(cls, row, **extra):
+    return cls(**{name: row[name] for name in cls.__dataclass_fields__ if name not in extra}, **extra)
+
+
+class CatalogSnapshot:
+    # Увесь публічний каталог однієї ревізії: записи + готові індекси і картки.
+    # Після побудови не змінюється, тож його безпечно читати з будь-якого потоку
+    __slots__ = ("revision", "products", "colors", "active", "by_price", "by_category", "compositions", "cards")
+
+    def __init__(self, revision, products, compositions):
+        self.revision = revision
+        self.products = {p.id: p for p in products}
+        self.colors = {c.id: c for p in products for c in p.colors}
+        self.active = tuple(sorted((p for p in products if p.is_active), key=lambda p: p.id, reverse=True))
+        self.by_price = tuple(sorted(self.active, key=lambda p: (p.price or 0, p.id)))
+        by_category = {}
+        for product in self.active:
+            by_category.setdefault(product.category, []).append(product)
+        self.by_category = {category: tuple(items) for category, items in by_category.items()}
+        self.compositions = tuple(sorted(compositions, key=lambda c: (c.created_at or datetime.min), reverse=True))
+        self.cards = {p.id: {"product": p, "cover": p.cover,
+                             "price_from": cents_to_price(p.price_from), "price_to": cents_to_price(p.price_to)}
+                      for p in products}
+
+    @classmethod
+    def build(cls):
+        # Ревізія читається першою в тій самій транзакції: якщо каталог зміниться під час
+        # побудови, наступний запит побачить новішу ревізію і збере знімок заново
+        session = db.session
+        revision = session.execute(select(CatalogRevision.revision).where(CatalogRevision.id == 1)).scalar() or 0
+        prices = {(row.product_id, row.color_id): row.price_cents
+                  for row in session.execute(select(ProductPrice.__table__))}
+        colors, images = {}, {}
+        for row in session.execute(select(Color.__table__).order_by(Color.id)).mappings():
+            colors.setdefault(row["product_id"], []).append(
+                _record(ColorRecord, row, price_cents=prices.get((row["product_id"], row["id"]), 0)))
+        for row in session.execute(select(ProductImage.__table__)
+                                   .order_by(ProductImage.sort_order, ProductImage.id)).mappings():
+            images.setdefault(row["product_id"], []).append(_record(ImageRecord, row))
+
+        products = []
+        for row in session.execute(select(Product.__table__)).mappings():
+            product_colors = tuple(colors.get(row["id"], ()))
+            base = prices.get((row["id"], NO_COLOR), 0)
+            color_prices = [c.price_cents for c in product_colors]
+            products.append(_record(
+                ProductRecord, row, colors=product_colors, images=tuple(images.get(row["id"], ())),
+                price_cents=base,
+                price_from=min(color_prices) if color_prices else base,
+                price_to=max(color_prices) if color_prices else base,
+            ))
+        compositions = [_record(CompositionRecord, row) for row in session.execute(
+            select(Composition.__table__).where(Composition.is_active == True)).mappings()]  # noqa: E712
+        return cls(revision, products, compositions)
+
+    # ---------- каталог: ті самі фільтри, сортування і курсори, що й SQL-шлях у services/catalog.py ----------
+
+    @staticmethod
+    def _predicate(filters, skip=None):
+        # Фільтр як одна функція: ціновий діапазон і значення розібрані один раз на запит
+        category = filters.get("category") if skip != "category" else None
+        wax_type = filters.get("wax_type") if skip != "wax_type" else None
+        band = None
+        if filters.get("price") and skip != "price":
+            band = next(((low, high) for key, low, high in price_bands() if key == filters["price"]), None)
+
+        def matches(product):
+            if category and product.category != category:
+                return False
+            if wax_type and product.wax_type != wax_type:
+                return False
+            if band:
+                low, high = band
+                if product.price is None or product.price < low or (high is not None and product.price >= high):
+                    return False
+            return True
+        return matches
+
+    def catalog_page(self, filters, sort="new", cursor=None, page_size=24):
+        if sort == "new":
+            candidates = self.by_category.get(filters["category"], ()) if filters.get("category") else self.active
+            key = lambda p: (p.id,)  # noqa: E731
+        else:
+            candidates = self.by_price if sort == "price_asc" else reversed(self.by_price)
+            key = lambda p: (p.price or 0, p.id)  # noqa: E731
+        values = decode_cursor(cursor)
+        after = tuple(values) if values and len(values) == (1 if sort == "new" else 2) else None
+        matches = self._predicate(filters)
+        page = []
+        for product in candidates:
+            if after is not None:
+                position = key(product)
+                if (position <= after) if sort == "price_asc" else (position >= after):
+                    continue
+            if not matches(product):
+                continue
+            page.append(product)
+            if len(page) > page_size:
+                break
+        next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            next_cursor = encode_cursor(list(key(page[-1])))
+        return [self.cards[p.id] for p in page], next_cursor
+
+    def facets(self, filters):
+        facets = {}
+        for field in ("category", "wax_type"):
+            matches = self._predicate(filters, skip=field)
+            counts = Counter(getattr(p, field) for p in self.active if matches(p))
+            facets[field] = sorted((value, count) for value, count in counts.items() if value)
+        bands = price_bands()
+        counts = Counter()
+        matches = self._predicate(filters, skip="price")
+        for product in self.active:
+            if product.price is None or not matches(product):
+                continue
+            for key, low, high in bands:
+                if product.price >= low and (high is None or product.price < high):
+                    counts[key] += 1
+                    break
+        facets["price"] = [(key, low, high, counts.get(key, 0)) for key, low, high in bands]
+        return facets
+
+
+class _Holder:
+    def __init__(self):
+        self.snapshot = None
+        self.lock = threading.Lock()
+
+
+def init_app(app):
+    app.extensions["catalog_snapshot"] = _Holder()
+
+
+def current_snapshot():
+    # Знімок актуальної ревізії: перевірка — ревізія з catalog_stamp (один запит на HTTP-запит,
+    # спільний з ETag), перебудова — лише після зміни каталогу (ревізію піднімає services/revision.py).
+    # Нова версія підміняється одним присвоєнням, запити зі старою дочитують її без змін;
+    # у межах запиту сторінка й фасети беруть той самий знімок з g.
+    # None — знімок вимкнено (CATALOG_SNAPSHOT=0), читаємо з БД як раніше
+    holder = current_app.extensions.get("catalog_snapshot")
+    if holder is None or not current_app.config.get("CATALOG_SNAPSHOT"):
+        return None
+    revision = catalog_stamp()[0]
+    snapshot = g.get("catalog_snapshot") if has_request_context() else None
+    if snapshot is not None and snapshot.revision == revision:
+        return snapshot
+    snapshot = holder.snapshot
+    if snapshot is None or snapshot.revision != revision:
+        with holder.lock, uncounted():
+            snapshot = holder.snapshot
+            if snapshot is None or snapshot.revision != revision:
+                snapshot = holder.snapshot = CatalogSnapshot.build()
+    if has_request_context():
+        g.catalog_snapshot = snapshot
+    return snapshot
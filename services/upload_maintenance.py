@@ -0,0 +1,53 @@
+# services/upload_maintenance.py
+import os, time
+from extensions import db
+from models import ProductImage, Composition, ImageJob
+from services.images import ensure_upload_dir, owner_stem
+
+BATCH = 1000
+
+
+def referenced_stems():
+    # Усі оригінали, на які є посилання; читаємо лише потрібні стовпці порціями
+    stems = set()
+    queries = (
+        db.session.query(ProductImage.filename),
+        db.session.query(Composition.image).filter(Composition.image.isnot(None)),
+        db.session.query(ImageJob.filename).filter(ImageJob.status.in_(("pending", "running"))),
+    )
+    for query in queries:
+        for (filename,) in query.yield_per(BATCH):
+            stems.add(filename.rsplit(".", 1)[0])
+    return stems
+
+
+def find_orphans(min_age=3600):
+    # Генератор (шлях, розмір) файлів без власника. Свіжі файли пропускаємо:
+    # завантаження могло вже записати файл, але ще не закомітити рядок
+    stems = referenced_stems()
+    cutoff = time.time() - min_age
+    with os.scandir(ensure_upload_dir()) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if stat.st_mtime > cutoff:
+                continue
+            if entry.name.endswith(".part") or owner_stem(entry.name) not in stems:
+                yield entry.path, stat.st_size
+
+
+def images_needing_derivatives():
+    # Оригінали без прев’ю/адаптивних похідних або з файлом прев’ю, якого немає на диску
+    upload_dir = ensure_upload_dir()
+    seen = set()
+    rows = db.session.query(ProductImage.filename, ProductImage.preview_filename,
+                            ProductImage.variants, ProductImage.status)
+    for filename, preview, variants, status in rows.yield_per(BATCH):
+        if filename in seen:
+            continue
+        missing = (status != "ready" or not preview or not variants
+                   or not os.path.exists(os.path.join(upload_dir, preview)))
+        if missing:
+            seen.add(filename)
+            yield filename, os.path.exists(os.path.join(upload_dir, filename))
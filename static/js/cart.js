@@ -1,3 +1,54 @@
 // static/js/cart.js
-// оновлення кількості та видалення реалізовані у шаблоні cart.html через fetch + reload
-// тут можна додати глобальні слухачі, якщо потрібно
\ No newline at end of file
+// сторінка кошика: зміни кількості й видалення збираються і йдуть одним запитом на /cart/update,
+// суми оновлюються з відповіді без перезавантаження
+document.querySelectorAll("[data-cart]").forEach((cart) => {
+  const pending = {};
+  let timer = null;
+  let inflight = Promise.resolve();
+
+  const apply = (state) => {
+    cart.querySelectorAll("[data-line]").forEach((row) => {
+      const line = state.lines[row.dataset.line];
+      if (!line) { row.remove(); return; }
+      const input = row.querySelector('[data-action="qty-update"]');
+      if (document.activeElement !== input && !(row.dataset.line in pending)) input.value = line.quantity;
+      row.querySelector('[data-role="subtotal"]').textContent = line.subtotal.toFixed(2);
+    });
+    cart.querySelector('[data-role="total"]').textContent = state.total.toFixed(2);
+    if (!Object.keys(state.lines).length) {
+      cart.hidden = true;
+      document.querySelector('[data-role="empty"]').hidden = false;
+    }
+  };
+
+  const flush = () => {
+    const lines = { ...pending };
+    Object.keys(pending).forEach((key) => delete pending[key]);
+    // запити йдуть по черзі, щоб старіша відповідь не перезаписала новішу
+    inflight = inflight.then(async () => {
+      const resp = await fetch(cart.dataset.updateUrl, {
+        method: "POST", headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ lines })
+      });
+      if (resp.ok) apply(await resp.json());
+    });
+  };
+
+  const queue = (lineId, quantity, delay) => {
+    pending[lineId] = quantity;
+    clearTimeout(timer);
+    timer = setTimeout(flush, delay);
+  };
+
+  cart.addEventListener("input", (e) => {
+    if (e.target.dataset.action !== "qty-update") return;
+    const qty = parseInt(e.target.value, 10);
+    if (qty >= 1) queue(e.target.closest("[data-line]").dataset.line, qty, 400);
+  });
+  cart.addEventListener("click", (e) => {
+    if (e.target.dataset.action !== "remove") return;
+    const row = e.target.closest("[data-line]");
+    row.style.opacity = 0.5;
+    queue(row.dataset.line, 0, 0);
+  });
+});
@@ -0,0 +1,27 @@
+// static/js/search.js
+// автодоповнення в полі пошуку: запит до /search/suggest із затримкою, підказки — у <datalist>
+document.querySelectorAll("input[data-suggest-url]").forEach((input) => {
+  const list = document.getElementById(input.getAttribute("list"));
+  let timer = null;
+  let controller = null;
+
+  input.addEventListener("input", () => {
+    clearTimeout(timer);
+    const q = input.value.trim();
+    if (q.length < 2) { list.innerHTML = ""; return; }
+    timer = setTimeout(async () => {
+      if (controller) controller.abort();
+      controller = new AbortController();
+      try {
+        const resp = await fetch(`${input.dataset.suggestUrl}?q=${encodeURIComponent(q)}`, { signal: controller.signal });
+        const data = await resp.json();
+        list.innerHTML = "";
+        data.results.forEach((item) => {
+          const option = document.createElement("option");
+          option.value = item.name;
+          list.appendChild(option);
+        });
+      } catch (e) { /* перерваний запит — ігноруємо */ }
+    }, 150);
+  });
+});